@@ -0,0 +1,78 @@
+'''
+	Script measuring the import time of the scoring modules, so that a heavy dependency pulled in at import time does not go unnoticed.
+	Every import is timed in a fresh interpreter (a subprocess), repeated a few times, and the median is reported together with
+	the heavy libraries the import loaded. The heavy libraries should only be loaded at first use or by warm_up, which is timed too.
+	Exits with status 1 if an import takes longer than the threshold or loads a heavy library, so it can guard a build.
+	Syntax-
+			python benchmark_imports.py [<maximum seconds per import, default 1.0>] [<repeats, default 5>]
+'''
+
+'''
+	Dependencies for the script. Libraries used:
+	1) SYS
+	2) SUBPROCESS
+	3) JSON
+'''
+import sys
+import subprocess
+import json
+
+'''
+	Modules timed, libraries that must not be loaded by importing them, and the code run in every subprocess.
+'''
+MODULES = ('textnorm', 'lrucache', 'taggers', 'jsonstream', 'featurecache', 'featureclass', 'brownfreqs', 'lsh',
+	'short_sentence_similarity', 'semantic_matrix', 'untruthfulspam')
+HEAVY = ('nltk', 'pandas', 'enchant', 'sklearn', 'gensim')
+TIMER = '''
+import sys, time, json
+start = time.time()
+%s
+seconds = time.time() - start
+print json.dumps([seconds, [name for name in %r if name in sys.modules]])
+'''
+
+'''
+	Function to run a statement in a fresh interpreter.
+	Input: statement
+	Output: seconds taken and the heavy libraries loaded
+'''
+
+def time_statement(statement):
+	output = subprocess.check_output([sys.executable, '-c', TIMER % (statement, HEAVY)])
+	return json.loads(output.strip().splitlines()[-1])
+
+'''
+	Function to time a statement several times.
+	Input: statement, number of repeats
+	Output: median seconds and the heavy libraries loaded
+'''
+
+def median_time(statement, repeats):
+	runs = [time_statement(statement) for i in range(repeats)]
+	seconds = sorted(run[0] for run in runs)
+	return seconds[len(seconds) // 2], runs[0][1]
+
+threshold = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+failed = False
+print "%-40s%12s  %s" % ('statement', 'seconds', 'heavy libraries loaded')
+for module in MODULES:
+	seconds, loaded = median_time('import ' + module, repeats)
+	print "%-40s%12.3f  %s" % ('import ' + module, seconds, ', '.join(loaded))
+	if seconds > threshold or loaded:
+		failed = True
+
+'''
+	warm_up loads everything on purpose; it is reported for reference and not checked against the threshold.
+'''
+statement = 'import featureclass; featureclass.warm_up()'
+try:
+	seconds, loaded = median_time(statement, 1)
+	print "%-40s%12.3f  %s" % ('featureclass.warm_up()', seconds, ', '.join(loaded))
+except subprocess.CalledProcessError:
+	print "%-40s%12s" % ('featureclass.warm_up()', 'failed')
+
+if failed:
+	print "Import time regression: an import exceeded %.3f seconds or loaded a heavy library" % threshold
+	sys.exit(1)
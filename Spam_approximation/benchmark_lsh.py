@@ -0,0 +1,122 @@
+'''
+	Script benchmarking the candidate pairs of MinHash LSH (lsh.py) on a collection the size of a real review site.
+	The collection is made from the reviews of the corpora: every review once, then reviews recombined from random sentences
+	of the corpus reviews until the collection has the requested size, and edited copies of some reviews (one word deleted
+	and one word repeated) as the near duplicates to find.
+	Times the signatures and the candidate pairs, counts the candidate pairs against all pairs and against the size of the
+	collection, and counts the candidate pairs whose shingle sets have an exact Jaccard similarity of 0.5 or more. Then checks
+	that at least 90% of the edited copies with an exact Jaccard similarity of 0.7 or more to their review are found, as
+	lsh.py states for its defaults (short reviews lose most of their shingles to an edit and may fall below the threshold).
+	Syntax-
+			python benchmark_lsh.py [<number of reviews, default 100000>] [<corpus> ...]
+				a corpus is a JSON file of reviews with a 'content' field or a directory of op_spam review folds
+'''
+
+'''
+	Dependencies for the script. Libraries used:
+	1) SYS
+	2) OS
+	3) TIME
+	4) RANDOM
+	5) RE
+	6) TEXTNORM (textnorm)
+	7) MinHashLSH (lsh)
+	8) SemanticMatrix (semantic_matrix), to read the corpora
+'''
+import sys
+import os
+import time
+import random
+import re
+import textnorm
+from lsh import MinHashLSH
+from semantic_matrix import SemanticMatrix, CORPORA
+
+NUM_REVIEWS = 100000
+NUM_COPIES = 200
+SEED = 1
+CLOSE = 0.5
+COPY_JACCARD = 0.7
+COPY_RECALL = 0.9
+
+'''
+	Function to make an edited copy of a review: one word deleted and one word repeated.
+	Input: review, random generator
+	Output: edited review
+'''
+
+def edited_copy(review, generator):
+	words = review.split()
+	del words[generator.randrange(len(words))]
+	k = generator.randrange(len(words))
+	words.insert(k, words[k])
+	return u' '.join(words)
+
+'''
+	Function to compute the exact Jaccard similarity of the shingle sets of two reviews.
+	Input: MinHashLSH object, two term lists
+	Output: Jaccard similarity
+'''
+
+def exact_jaccard(lsh, words_1, words_2):
+	shingles_1 = set(lsh.shingles(words_1).tolist())
+	shingles_2 = set(lsh.shingles(words_2).tolist())
+	return len(shingles_1 & shingles_2) / float(max(len(shingles_1 | shingles_2), 1))
+
+num_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_REVIEWS
+corpora = sys.argv[2:] or [path for path in CORPORA if os.path.exists(path)]
+generator = random.Random(SEED)
+
+reviews = []
+for path in corpora:
+	reviews.extend(SemanticMatrix.corpus_reviews(path))
+corpus_size = len(reviews)
+sentences = [sentence for review in reviews for sentence in re.split(r'(?<=[.!?])\s+', review.strip()) if sentence]
+originals = generator.sample(range(corpus_size), min(NUM_COPIES, corpus_size))
+while len(reviews) < num_reviews - len(originals):
+	reviews.append(u' '.join(generator.sample(sentences, generator.randint(4, 12))))
+copies = {}
+for original in originals:
+	copies[len(reviews)] = original
+	reviews.append(edited_copy(reviews[original], generator))
+
+lsh = MinHashLSH()
+start = time.time()
+word_lists = textnorm.vectorize_batch(reviews, lowercase=True, keep_pronouns=False)
+vectorize_seconds = time.time() - start
+start = time.time()
+signatures, valid = lsh.signatures(word_lists)
+signature_seconds = time.time() - start
+start = time.time()
+candidates = 0
+found = set()
+close = 0
+for i, j in lsh.candidate_pairs(signatures, valid):
+	candidates += 1
+	if copies.get(j) == i:
+		found.add(j)
+	if exact_jaccard(lsh, word_lists[i], word_lists[j]) >= CLOSE:
+		close += 1
+candidate_seconds = time.time() - start
+above = [copy for copy, original in copies.items()
+	if exact_jaccard(lsh, word_lists[original], word_lists[copy]) >= COPY_JACCARD]
+found_above = len(found.intersection(above))
+
+print "%d reviews: %d corpus reviews, %d recombined, %d edited copies" % (len(reviews), corpus_size,
+	len(reviews) - corpus_size - len(copies), len(copies))
+print "%d hash functions, %d bands of %d rows, %d-gram shingles, threshold J = %.2f" % (lsh.num_hashes, lsh.bands, lsh.rows,
+	lsh.shingle_size, (1.0 / lsh.bands) ** (1.0 / lsh.rows))
+print
+print "%-40s%12s" % ('', 's')
+print "%-40s%12.2f" % ('vectorize', vectorize_seconds)
+print "%-40s%12.2f" % ('signatures', signature_seconds)
+print "%-40s%12.2f" % ('candidate pairs (with exact Jaccard)', candidate_seconds)
+print
+print "%-40s%12d" % ('all pairs', len(reviews) * (len(reviews) - 1) // 2)
+print "%-40s%12d" % ('candidate pairs', candidates)
+print "%-40s%12.3f" % ('candidate pairs per review', candidates / float(len(reviews)))
+print "%-40s%12d" % ('candidates with exact J >= %.1f' % CLOSE, close)
+print "%-40s%12s" % ('edited copies found', '%d/%d' % (len(found), len(copies)))
+print "%-40s%12s" % ('edited copies with J >= %.1f found' % COPY_JACCARD, '%d/%d' % (found_above, len(above)))
+assert found_above >= COPY_RECALL * len(above), 'too few edited copies were candidates'
+print "At least %d%% of the edited copies with J >= %.1f found." % (100 * COPY_RECALL, COPY_JACCARD)
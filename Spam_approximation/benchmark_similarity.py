@@ -0,0 +1,194 @@
+'''
+	Script benchmarking the word similarity of short_sentence_similarity on the 30 word pairs of its test block.
+	Times the uncached WordNet computation (the original implementation, kept here as the reference), the computation on
+	cold and warm WordNet caches, and the lookup in the word similarity cache, and checks that every value is identical
+	to the reference.
+	Then counts the word similarities computed by most_similar_word for the joint words of two long op_spam reviews, with
+	and without the floor used by sentence similarity, against a scan of every word, and checks that the most similar words
+	are those of the scan.
+	Syntax-
+			python benchmark_similarity.py [<repeats, default 5>]
+'''
+
+'''
+	Dependencies for the script. Libraries used:
+	1) SYS
+	2) TIME
+	3) MATH
+	4) NLTK
+	5) short_sentence_similarity
+	6) OS
+	7) TEXTNORM (textnorm)
+'''
+import sys
+import os
+import time
+import math
+import textnorm
+from nltk.corpus import wordnet as wn
+import short_sentence_similarity as sss
+from short_sentence_similarity import ALPHA, BETA, PHI, ETA
+
+REVIEW_DIRECTORY = 'positive_polarity'
+
+WORD_PAIRS = [
+	["asylum", "fruit", 0.21],
+	["autograph", "shore", 0.29],
+	["autograph", "signature", 0.55],
+	["automobile", "car", 0.64],
+	["bird", "woodland", 0.33],
+	["boy", "rooster", 0.53],
+	["boy", "lad", 0.66],
+	["boy", "sage", 0.51],
+	["cemetery", "graveyard", 0.73],
+	["coast", "forest", 0.36],
+	["coast", "shore", 0.76],
+	["cock", "rooster", 1.00],
+	["cord", "smile", 0.33],
+	["cord", "string", 0.68],
+	["cushion", "pillow", 0.66],
+	["forest", "graveyard", 0.55],
+	["forest", "woodland", 0.70],
+	["furnace", "stove", 0.72],
+	["glass", "tumbler", 0.65],
+	["grin", "smile", 0.49],
+	["gem", "jewel", 0.83],
+	["hill", "woodland", 0.59],
+	["hill", "mound", 0.74],
+	["implement", "tool", 0.75],
+	["journey", "voyage", 0.52],
+	["magician", "oracle", 0.44],
+	["magician", "wizard", 0.65],
+	["midday", "noon", 1.0],
+	["oracle", "sage", 0.43],
+	["love", "like", 0.39]
+]
+
+'''
+	Reference: the word similarity as computed before the WordNet caches, straight from WordNet on every call.
+'''
+
+def reference_similarity(word_1, word_2):
+	synsets_1 = wn.synsets(word_1)
+	synsets_2 = wn.synsets(word_2)
+	if len(synsets_1) == 0 or len(synsets_2) == 0:
+		return 0.0
+	max_sim = -1.0
+	synset_1, synset_2 = None, None
+	for s1 in synsets_1:
+		for s2 in synsets_2:
+			sim = wn.path_similarity(s1, s2)
+			if sim > max_sim:
+				max_sim = sim
+				synset_1, synset_2 = s1, s2
+	if synset_1 is None:
+		return 0.0
+	if synset_1 == synset_2:
+		l_dist = 0.0
+		h_dist = max([x[1] for x in synset_1.hypernym_distances()])
+	else:
+		wset_1 = set([str(x.name()) for x in synset_1.lemmas()])
+		wset_2 = set([str(x.name()) for x in synset_2.lemmas()])
+		if len(wset_1.intersection(wset_2)) > 0:
+			l_dist = 1.0
+		else:
+			l_dist = synset_1.shortest_path_distance(synset_2)
+			if l_dist is None:
+				l_dist = 0.0
+		hypernyms_1 = {x[0]:x[1] for x in synset_1.hypernym_distances()}
+		hypernyms_2 = {x[0]:x[1] for x in synset_2.hypernym_distances()}
+		lcs_candidates = set(hypernyms_1.keys()).intersection(set(hypernyms_2.keys()))
+		if len(lcs_candidates) > 0:
+			h_dist = max([max([hypernyms_1[c], hypernyms_2[c]]) for c in lcs_candidates])
+		else:
+			h_dist = 0
+	return math.exp(-ALPHA * l_dist) * ((math.exp(BETA * h_dist) - math.exp(-BETA * h_dist)) / (math.exp(BETA * h_dist) + math.exp(-BETA * h_dist)))
+
+'''
+	Reference: the most similar word of a word set, scanning every word as most_similar_word did before its pruning.
+'''
+
+def full_scan(word, word_set):
+	max_sim = -1.0
+	sim_word = ""
+	for ref_word in word_set:
+		sim = sss.word_similarity(word, ref_word)
+		if sim > max_sim:
+			max_sim = sim
+			sim_word = ref_word
+	return sim_word, max_sim
+
+'''
+	Function to count the word similarities computed by most_similar_word for the joint words of two reviews.
+	Input: word lists of the two reviews, floor passed to most_similar_word
+	Output: word similarities computed by a full scan and by most_similar_word
+'''
+
+def count_searches(words_1, words_2, floor):
+	calls = [0]
+	def counted(word_1, word_2):
+		calls[0] += 1
+		return sss.word_similarity(word_1, word_2)
+	joint_words = sorted(set(words_1).union(set(words_2)))
+	scanned = 0
+	for words in (words_1, words_2):
+		word_set = set(words)
+		for word in joint_words:
+			if word not in word_set:
+				scanned += len(word_set)
+				expected = full_scan(word, word_set)
+				found = sss.most_similar_word(word, word_set, floor, counted)
+				if floor is None or expected[1] > floor:
+					assert found == expected, 'pruning changed a most similar word'
+	return scanned, calls[0]
+
+'''
+	Function to time one pass over the word pairs.
+	Input: similarity function
+	Output: seconds taken and the similarities
+'''
+
+def time_pass(function):
+	start = time.time()
+	values = [function(pair[0], pair[1]) for pair in WORD_PAIRS]
+	return time.time() - start, values
+
+repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+wn.ensure_loaded()
+time_pass(reference_similarity)
+reference_seconds = min(time_pass(reference_similarity)[0] for i in range(repeats))
+expected = time_pass(reference_similarity)[1]
+
+cold_seconds = []
+for i in range(repeats):
+	sss.clear_wordnet_caches()
+	seconds, values = time_pass(sss.compute_word_similarity)
+	cold_seconds.append(seconds)
+	assert values == expected, 'WordNet caches changed a similarity'
+warm_seconds, values = time_pass(sss.compute_word_similarity)
+assert values == expected, 'WordNet caches changed a similarity'
+time_pass(sss.word_similarity)
+cached_seconds = time_pass(sss.word_similarity)[0]
+
+print "%-10s\t%-10s\t%s\t%s\t%s" % ('word 1', 'word 2', 'paper', 'reference', 'cached')
+for pair, reference, value in zip(WORD_PAIRS, expected, values):
+	print "%-10s\t%-10s\t%.2f\t%.4f\t\t%.4f" % (pair[0], pair[1], pair[2], reference, value)
+print
+print "%-40s%12s%10s" % ('30 word pairs', 'ms', 'speedup')
+print "%-40s%12.3f%10.1f" % ('reference (uncached WordNet)', 1000.0 * reference_seconds, 1.0)
+print "%-40s%12.3f%10.1f" % ('cold WordNet caches', 1000.0 * min(cold_seconds), reference_seconds / min(cold_seconds))
+print "%-40s%12.3f%10.1f" % ('warm WordNet caches', 1000.0 * warm_seconds, reference_seconds / max(warm_seconds, 1e-9))
+print "%-40s%12.3f%10.1f" % ('word similarity cache', 1000.0 * cached_seconds, reference_seconds / max(cached_seconds, 1e-9))
+print "All similarities identical to the reference."
+
+reviews = [open(os.path.join(REVIEW_DIRECTORY, name)).read().decode('utf-8', 'replace')
+	for name in sorted(os.listdir(REVIEW_DIRECTORY))[:2]]
+words_1, words_2 = [textnorm.vectorize(review, lowercase=True, keep_pronouns=False) for review in reviews]
+print
+print "most_similar_word on 2 reviews of %d and %d words" % (len(words_1), len(words_2))
+print "%-40s%12s%10s" % ('word similarities', 'computed', 'scanned')
+for label, floor in (('no floor', None), ('floor min(PHI, ETA)', min(PHI, ETA))):
+	scanned, computed = count_searches(words_1, words_2, floor)
+	print "%-40s%12d%10d" % (label, computed, scanned)
+print "All most similar words identical to the full scan."
@@ -0,0 +1,74 @@
+'''
+	Script to benchmark the POS tagger backends of taggers.py on the op_spam corpus.
+	For every backend it reports the reviews per second of feature extraction, the share of tokens tagged like the perceptron tagger,
+	and the drift of every feature value against the perceptron tagger (mean and maximum absolute difference).
+	The lookup table is built from the perceptron tags of the negative_polarity reviews (tag_table_benchmark.json) and the backends
+	are compared on the held out positive_polarity reviews. Every backend is timed after warm_up, with empty spelling and
+	sentiment caches, so that neither the one-time loads nor the cached results of another backend are counted.
+	Syntax-
+			python benchmark_taggers.py [<number of reviews>]
+'''
+
+'''
+	Dependencies for the script. Libraries used:
+	1) OS
+	2) SYS
+	3) TIME
+	4) NUMPY
+	5) FeatureClass (featureclass)
+	6) Taggers (taggers)
+'''
+import os
+import sys
+import time
+import numpy as np
+import featureclass
+from featureclass import FeatureClass, FEATURE_NAMES, pos_tagger, warm_up
+from taggers import LookupBackend
+
+TRAINING_DIRECTORIES = ['negative_polarity']
+TEST_DIRECTORIES = ['positive_polarity']
+BENCHMARK_TABLE = 'tag_table_benchmark.json'
+
+def load_corpus(directories):
+	reviews = []
+	for directory in directories:
+		for name in sorted(os.listdir(directory)):
+			reviews.append(str(open(directory + '/' + name).read()))
+	return reviews
+
+reviews = load_corpus(TEST_DIRECTORIES)
+if len(sys.argv) > 1:
+	reviews = reviews[:int(sys.argv[1])]
+
+reference = FeatureClass()
+training = load_corpus(TRAINING_DIRECTORIES)
+tagged = pos_tagger().tag_sents([reference.vectorize_text(review) for review in training])
+LookupBackend(LookupBackend.build_table(tagged)).save(BENCHMARK_TABLE)
+
+backends = ['perceptron', 'lookup:' + BENCHMARK_TABLE]
+results = {}
+for backend in backends:
+	features = FeatureClass(tagger=backend)
+	warm_up(backend)  # load the backend, punkt, enchant and VADER before timing
+	featureclass._spelling_cache.clear()
+	featureclass._sentiment_cache.clear()
+	start = time.time()
+	matrix = features.compute_features_batch(reviews)
+	elapsed = time.time() - start
+	tags = [tag for review in features.parse_batch(reviews) for (token, tag) in review.tagged]
+	results[backend] = (matrix, tags, elapsed)
+
+base_matrix, base_tags, base_elapsed = results['perceptron']
+print "%-30s%15s%15s" % ('backend', 'reviews/sec', 'tag agreement')
+for backend in backends:
+	matrix, tags, elapsed = results[backend]
+	agreement = np.mean([a == b for a, b in zip(tags, base_tags)]) if tags else 1.0
+	print "%-30s%15.1f%15.3f" % (backend, len(reviews) / elapsed, agreement)
+
+print
+print "%-30s%15s%15s" % ('feature drift (lookup)', 'mean abs', 'max abs')
+matrix = results[backends[1]][0]
+for column, name in enumerate(FEATURE_NAMES):
+	drift = np.abs(matrix[:, column] - base_matrix[:, column])
+	print "%-30s%15.4f%15.4f" % (name, drift.mean(), drift.max())
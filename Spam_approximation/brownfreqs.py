@@ -0,0 +1,90 @@
+'''
+	Script containing the Brown corpus word frequency table used by info_content in short_sentence_similarity.
+	The table is built once, offline, from the lowercased words of brown.sents(), and stored in a directory as .npy files:
+	the sorted vocabulary, the count of every word and the total number of words N. Loading memory maps the files, so it takes
+	milliseconds and every process shares the same read-only pages; words are looked up by binary search.
+	Syntax-
+			python brownfreqs.py [<output directory, default brown_freqs>]
+			<object_name> = BrownFrequencies.load(<directory>)
+			<object_name>.count(<word>)
+'''
+
+'''
+	Dependencies of the class. The different libraries used -
+	1> NUMPY
+	2> OS
+	3> COLLECTIONS
+	4> NLTK (imported only to build the table)
+'''
+import numpy as np
+import os
+from collections import Counter
+
+'''
+	Default directory of the table, and its files.
+'''
+BROWN_TABLE = 'brown_freqs'
+VOCABULARY_FILE = 'vocab.npy'
+COUNTS_FILE = 'counts.npy'
+TOTAL_FILE = 'total.npy'
+
+class BrownFrequencies:
+
+	'''
+		Constructor. vocabulary is the sorted array of words, counts their frequencies and total the number of words N.
+	'''
+
+	def __init__(self, vocabulary, counts, total):
+		self.vocabulary = vocabulary
+		self.counts = counts
+		self.total = int(total)
+
+	'''
+		Function to count the lowercased words of the Brown corpus, as info_content originally did at its first call.
+		Input: none
+		Output: BrownFrequencies object
+	'''
+
+	@staticmethod
+	def build():
+		from nltk.corpus import brown
+		frequencies = Counter()
+		for sent in brown.sents():
+			frequencies.update(word.lower() for word in sent)
+		words = sorted(frequencies)
+		vocabulary = np.array(words, dtype=np.unicode_)
+		counts = np.array([frequencies[word] for word in words], dtype=np.int64)
+		return BrownFrequencies(vocabulary, counts, sum(frequencies.values()))
+
+	def save(self, directory=BROWN_TABLE):
+		if not os.path.isdir(directory):
+			os.makedirs(directory)
+		np.save(os.path.join(directory, VOCABULARY_FILE), self.vocabulary)
+		np.save(os.path.join(directory, COUNTS_FILE), self.counts)
+		np.save(os.path.join(directory, TOTAL_FILE), np.array(self.total, dtype=np.int64))
+
+	@staticmethod
+	def load(directory=BROWN_TABLE):
+		load = lambda name: np.load(os.path.join(directory, name), mmap_mode='r')
+		return BrownFrequencies(load(VOCABULARY_FILE), load(COUNTS_FILE), load(TOTAL_FILE))
+
+	'''
+		Function to find the frequency of a word in the Brown corpus.
+		Input: lowercased word
+		Output: number of occurrences of the word, 0 if it does not occur
+	'''
+
+	def count(self, word):
+		if isinstance(word, bytes):
+			word = word.decode('utf-8', 'replace')
+		i = np.searchsorted(self.vocabulary, word)
+		if i < len(self.vocabulary) and self.vocabulary[i] == word:
+			return int(self.counts[i])
+		return 0
+
+if __name__ == '__main__':
+	import sys
+	directory = sys.argv[1] if len(sys.argv) > 1 else BROWN_TABLE
+	table = BrownFrequencies.build()
+	table.save(directory)
+	print "%d words, N = %d" % (len(table.vocabulary), table.total)
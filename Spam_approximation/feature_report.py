@@ -0,0 +1,137 @@
+'''
+	Script reporting what every feature of FeatureClass costs and what it adds to the SVR of fakereviews.py, on the op_spam corpus.
+	1) Extracts all the features in profile mode, recording the wall time and calls of every feature and of the shared
+	   parsing steps (tokens, tags, sentences). The models and dictionaries are loaded before, so their one-time loads
+	   are not counted as the cost of the features that trigger them.
+	2) Trains the SVR on the same split as fakereviews.py and measures the permutation importance of every feature on the
+	   held-out split, as the drop in accuracy (sign of the prediction against the label) when the feature is shuffled.
+	3) Prunes features greedily: repeatedly drops the feature whose removal saves the most time while the retrained model
+	   stays within the accuracy tolerance of the full model. A feature's cost includes the shared parsing steps that
+	   no remaining feature needs any more.
+	The selected subset can be passed to FeatureClass(features=[...]) for production scoring.
+	Syntax-
+			python feature_report.py [<accuracy tolerance, default 0.01>] [<number of reviews to sample>]
+'''
+
+'''
+	Dependencies for the script. Libraries used:
+	1) OS
+	2) SYS
+	3) NUMPY
+	4) Scikit-Learn
+	5) FeatureClass (featureclass)
+'''
+import os
+import sys
+import numpy as np
+from sklearn import svm
+from sklearn import preprocessing
+from sklearn.model_selection import train_test_split
+from featureclass import FeatureClass, FEATURE_NAMES, FEATURE_NEEDS, warm_up
+
+'''
+	Shared parsing steps timed by FeatureClass in profile mode, and the number of shuffles per feature for permutation importance.
+'''
+SHARED_STEPS = ('tokens', 'tags', 'sentences')
+REPEATS = 5
+
+'''
+	Loads the reviews of the corpus directories. Labelled 1 if they are true reviews and -1 if they are deceptive (file name starting with d).
+'''
+
+def load_corpus(directories):
+	reviews = []
+	target = []
+	for directory in directories:
+		for name in sorted(os.listdir(directory)):
+			reviews.append(str(open(directory + '/' + name).read()))
+			target.append(-1 if name.split('_')[0] == 'd' else 1)
+	return reviews, np.array(target)
+
+'''
+	Seconds per review of computing a subset of features, including the shared parsing steps the subset needs.
+'''
+
+def subset_cost(subset, timings, num_reviews):
+	steps = set(['tokens'])
+	for name in subset:
+		steps.update(need for need in FEATURE_NEEDS[name] if need in SHARED_STEPS)
+	seconds = sum(timings.get(name, (0.0, 0))[0] for name in subset)
+	seconds += sum(timings.get(step, (0.0, 0))[0] for step in steps)
+	return seconds / num_reviews
+
+'''
+	Share of reviews whose predicted score has the sign of their label.
+'''
+
+def accuracy(clf, X, y):
+	return np.mean(np.sign(clf.predict(X)) == y)
+
+'''
+	Trains the SVR on a subset of the columns and returns the model and its held-out accuracy.
+'''
+
+def fit_subset(columns):
+	scaler = preprocessing.StandardScaler().fit(X_train[:, columns])
+	clf = svm.SVR()
+	clf.fit(scaler.transform(X_train[:, columns]), y_train)
+	return clf, scaler, accuracy(clf, scaler.transform(X_test[:, columns]), y_test)
+
+tolerance = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+reviews, y = load_corpus(['negative_polarity', 'positive_polarity'])
+if len(sys.argv) > 2:
+	sample = np.random.RandomState(0).permutation(len(reviews))[:int(sys.argv[2])]
+	reviews, y = [reviews[i] for i in sample], y[sample]
+
+features = FeatureClass(profile=True)
+warm_up(features.tagger)
+X = features.compute_features_batch(reviews)
+timings = features.timings
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size = 0.33, random_state=42)
+
+'''
+	Permutation importance of every feature for the full model.
+'''
+all_columns = list(range(len(FEATURE_NAMES)))
+clf, scaler, base_accuracy = fit_subset(all_columns)
+X_test_scaled = scaler.transform(X_test)
+random_state = np.random.RandomState(42)
+importance = {}
+for column, name in enumerate(FEATURE_NAMES):
+	drops = []
+	for repeat in range(REPEATS):
+		shuffled = X_test_scaled.copy()
+		shuffled[:, column] = random_state.permutation(shuffled[:, column])
+		drops.append(base_accuracy - accuracy(clf, shuffled, y_test))
+	importance[name] = (np.mean(drops), np.std(drops))
+
+print "%-28s%12s%10s%14s%14s" % ('feature', 'ms/review', 'calls', 'importance', 'std')
+for name in FEATURE_NAMES:
+	seconds, calls = timings.get(name, (0.0, 0))
+	print "%-28s%12.3f%10d%14.4f%14.4f" % (name, 1000.0 * seconds / len(reviews), calls, importance[name][0], importance[name][1])
+for step in SHARED_STEPS:
+	seconds, calls = timings.get(step, (0.0, 0))
+	print "%-28s%12.3f%10d" % ('(shared) ' + step, 1000.0 * seconds / len(reviews), calls)
+
+'''
+	Greedy cost-aware pruning within the accuracy tolerance.
+'''
+selected = list(FEATURE_NAMES)
+selected_accuracy = base_accuracy
+while len(selected) > 1:
+	best = None
+	for name in selected:
+		subset = [other for other in selected if other != name]
+		saving = subset_cost(selected, timings, len(reviews)) - subset_cost(subset, timings, len(reviews))
+		subset_accuracy = fit_subset([FEATURE_NAMES.index(other) for other in subset])[2]
+		if subset_accuracy >= base_accuracy - tolerance and (best is None or saving > best[1]):
+			best = (name, saving, subset_accuracy)
+	if best is None:
+		break
+	selected.remove(best[0])
+	selected_accuracy = best[2]
+
+print
+print "full model:     accuracy %.4f, %.3f ms/review" % (base_accuracy, 1000.0 * subset_cost(FEATURE_NAMES, timings, len(reviews)))
+print "pruned model:   accuracy %.4f, %.3f ms/review (tolerance %.4f)" % (selected_accuracy, 1000.0 * subset_cost(selected, timings, len(reviews)), tolerance)
+print "FeatureClass(features=%r)" % (selected,)
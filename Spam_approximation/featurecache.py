@@ -0,0 +1,151 @@
+'''
+	Script containing the on-disk cache of feature vectors used by FeatureClass.
+	Feature vectors are stored in an SQLite file, keyed by the hash of the review text together with the version of the feature set,
+	so a changed review or a changed feature set never reads a stale vector. The cache holds at most max_entries vectors and
+	evicts the least recently used ones first. Hits are marked as recently used in memory and written in batches of TOUCH_EVERY,
+	with the next put, and on flush or close.
+	Syntax-
+			<object_name> = FeatureCache(<path>, <version>)
+			<FeatureClass object> = FeatureClass(cache_path=<path>)
+'''
+
+'''
+	Dependencies of the class. The different libraries used -
+	1> SQLITE3
+	2> HASHLIB
+	3> NUMPY
+'''
+import sqlite3
+import hashlib
+import numpy as np
+
+'''
+	SQLite allows a limited number of parameters in one statement, so keys are looked up in chunks of this size.
+'''
+QUERY_CHUNK = 500
+TOUCH_EVERY = 1000
+
+class FeatureCache:
+
+	'''
+		Constructor to open (or create) the cache file.
+		Input: path of the SQLite file, version string of the feature set, maximum number of cached vectors
+	'''
+
+	def __init__(self, path, version, max_entries=2000000):
+		self.path = path
+		self.version = version
+		self.max_entries = max_entries
+		self.hits = 0
+		self.misses = 0
+		self.touched = {}
+		self.connection = sqlite3.connect(path)
+		self.connection.execute('CREATE TABLE IF NOT EXISTS features (key TEXT PRIMARY KEY, vector BLOB, last_used INTEGER)')
+		self.connection.execute('CREATE INDEX IF NOT EXISTS features_last_used ON features (last_used)')
+		self.connection.commit()
+		self.clock = self.connection.execute('SELECT COALESCE(MAX(last_used), 0) FROM features').fetchone()[0]
+		self.entries = self.connection.execute('SELECT COUNT(*) FROM features').fetchone()[0]
+
+	'''
+		Function to find the cache key of a review: the SHA-1 of the feature set version and the review text.
+		Input: review (text)
+		Output: hex digest
+	'''
+
+	def key(self, text):
+		if not isinstance(text, bytes):
+			text = text.encode('utf-8')
+		digest = hashlib.sha1(self.version.encode('utf-8'))
+		digest.update(b'\0')
+		digest.update(text)
+		return digest.hexdigest()
+
+	'''
+		Function to look up the feature vectors of many reviews. Vectors found are marked as recently used.
+		Input: list of reviews
+		Output: list with a float64 NumPy vector for every review found in the cache and None for every other one
+	'''
+
+	def get_many(self, texts):
+		keys = [self.key(text) for text in texts]
+		found = {}
+		for i in range(0, len(keys), QUERY_CHUNK):
+			chunk = keys[i:i + QUERY_CHUNK]
+			query = 'SELECT key, vector FROM features WHERE key IN (%s)' % ','.join('?' * len(chunk))
+			for key, vector in self.connection.execute(query, chunk):
+				found[key] = np.frombuffer(bytes(vector), dtype=np.float64)
+		if found:
+			self.clock += 1
+			for key in found:
+				self.touched[key] = self.clock
+			if len(self.touched) >= TOUCH_EVERY:
+				self.flush()
+		vectors = [found.get(key) for key in keys]
+		misses = sum(1 for vector in vectors if vector is None)
+		self.hits += len(keys) - misses
+		self.misses += misses
+		return vectors
+
+	'''
+		Function to store the feature vectors of many reviews, evicting the least recently used vectors past max_entries.
+		Input: list of reviews, matrix with one row of features per review
+		Output: none
+	'''
+
+	def put_many(self, texts, matrix):
+		self.write_touched()
+		self.clock += 1
+		rows = {}
+		for text, vector in zip(texts, matrix):
+			vector = np.asarray(vector, dtype=np.float64)
+			rows[self.key(text)] = (sqlite3.Binary(vector.tobytes()), self.clock)
+		keys = list(rows)
+		existing = 0
+		for i in range(0, len(keys), QUERY_CHUNK):
+			chunk = keys[i:i + QUERY_CHUNK]
+			query = 'SELECT COUNT(*) FROM features WHERE key IN (%s)' % ','.join('?' * len(chunk))
+			existing += self.connection.execute(query, chunk).fetchone()[0]
+		cursor = self.connection.executemany('INSERT OR REPLACE INTO features (key, vector, last_used) VALUES (?, ?, ?)',
+			[(key, vector, clock) for key, (vector, clock) in rows.items()])
+		self.entries += cursor.rowcount - existing
+		if self.entries > self.max_entries:
+			self.connection.execute('DELETE FROM features WHERE key IN '
+				'(SELECT key FROM features ORDER BY last_used LIMIT ?)', (self.entries - self.max_entries,))
+			self.entries = self.max_entries
+		self.connection.commit()
+
+	'''
+		Function to write the pending recently used marks of the hits, without committing them.
+	'''
+
+	def write_touched(self):
+		if self.touched:
+			self.connection.executemany('UPDATE features SET last_used = ? WHERE key = ?',
+				[(clock, key) for key, clock in self.touched.items()])
+			self.touched = {}
+
+	'''
+		Function to commit the pending recently used marks of the hits to the file.
+	'''
+
+	def flush(self):
+		if self.touched:
+			self.write_touched()
+			self.connection.commit()
+
+	'''
+		Function to return the hit and miss counters of the cache.
+		Input: none
+		Output: dictionary with hits, misses and the number of cached vectors
+	'''
+
+	def stats(self):
+		return {'hits': self.hits, 'misses': self.misses, 'entries': self.entries}
+
+	'''
+		Function to close the cache file.
+	'''
+
+	def close(self):
+		self.flush()
+		self.connection.close()
@@ -9,27 +9,33 @@
 '''
 	Dependencies of the class. The different libraries used - 
 	1> NLTK
-	2> JSON
-	3> RE (regular expressions)
-	4> ENCHANT
-	5> MATH
-	6> PANDAS
-	7> SYS
-'''
-import nltk
-from nltk.corpus import stopwords
-from nltk.corpus import wordnet as wn
-import json
-from nltk.corpus import brown
-import re
-import enchant
-from nltk.collocations import *
+	2> TEXTNORM (textnorm)
+	3> ENCHANT
+	4> MATH
+	5> PANDAS
+	6> NUMPY
+	7> MULTIPROCESSING
+	8> FEATURECACHE (featurecache)
+	9> LRUCACHE (lrucache)
+	10> TAGGERS (taggers)
+	11> JSONSTREAM (jsonstream)
+	12> ITERTOOLS
+	13> TIME
+	14> ATEXIT
+	NLTK (punkt, WordNet, VADER), ENCHANT and PANDAS are heavy to import, so they are imported at their first use (or by warm_up).
+'''
+import textnorm
 from collections import Counter
 import math
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import pandas as pd
-from pandas.io.json import json_normalize
-from sys import argv
+import numpy as np
+import multiprocessing
+import time
+import atexit
+from featurecache import FeatureCache
+from lrucache import LRUCache
+from taggers import get_tagger, DEFAULT_TAGGER
+from jsonstream import iter_json_items
+from itertools import islice
 
 '''
 	Project aim - To give a probabilistic rating to how fake a review is
@@ -75,6 +81,227 @@ from sys import argv
     WRB wh-abverb where, when
 
 '''
+NOUN_TAGS = ('NN','NNS','NNP','NNPS')
+VERB_TAGS = ('VB','VBD','VBG','VBN','VBP','VBZ')
+ADJECTIVE_TAGS = ('JJ','JJS','JJR')
+ADVERB_TAGS = ('RB','RBS','RBR')
+PRONOUN_TAGS = ('PRP','PRP$')
+
+'''
+	Registry of the features, in the default column order of the matrix returned by add_features_batch.
+	Each feature is the FeatureClass method of the same name, listed with the shared resources it needs:
+			tags		POS tagging of the review
+			sentences	sentence splitting of the review
+			spelling	the enchant dictionary
+			sentiment	the VADER analyzer
+	Only the resources needed by the selected features are ever built, so e.g. the stylistic profile never tags a review.
+'''
+FEATURES = (
+	("percentnouns", ('tags',)),
+	("percentverbs", ('tags',)),
+	("percentpronouns", ('tags',)),
+	("modalverbsratio", ('tags',)),
+	("capitalized_diversity", ()),
+	("repeated_tokens", ()),
+	("emotiveness_diversity", ('tags',)),
+	("spelling_check", ('tags','spelling')),
+	("self_reference_diversity", ('tags',)),
+	("text_orientation", ()),
+	("sentiment_orientation", ('sentences','sentiment')),
+	("lexical_diversity", ()),
+	("content_diversity", ('tags',)),
+	("pos_n_grams_diversity", ('tags',)),
+	("lexical_entropy", ('tags',)),
+)
+FEATURE_NEEDS = dict(FEATURES)
+
+'''
+	Names of all the features. Training and prediction must use the same columns, so always build matrices through
+	add_features_batch, whose columns follow the feature names of the FeatureClass object.
+'''
+FEATURE_NAMES = tuple(name for name, needs in FEATURES)
+
+'''
+	Named feature selections, usable as FeatureClass(features=<profile name>).
+'''
+PROFILES = {
+	'all': FEATURE_NAMES,
+	'stylistic': ('capitalized_diversity', 'repeated_tokens', 'text_orientation', 'lexical_diversity'),
+	'syntactic': tuple(name for name, needs in FEATURES if needs == ('tags',)),
+}
+
+'''
+	Version of the feature definitions. Bump it whenever a feature changes so that cached feature vectors are not reused.
+'''
+FEATURE_SET_VERSION = "2"
+
+'''
+	Resources shared by all the FeatureClass objects of a process. Each of them is loaded at its first use and then reused
+	for every review, instead of being rebuilt by every feature call.
+'''
+_spelling_dictionary = None
+_sentiment_analyzer = None
+
+def pos_tagger(name=DEFAULT_TAGGER):
+	return get_tagger(name)
+
+def common_words():
+	return textnorm.stopword_set(keep_pronouns=True)
+
+def spelling_dictionary():
+	global _spelling_dictionary
+	if _spelling_dictionary is None:
+		import enchant
+		_spelling_dictionary = enchant.Dict("en_GB")
+	return _spelling_dictionary
+
+'''
+	Review vocabulary is very repetitive, so the result of the dictionary lookup of every word is memoized in a bounded
+	cache shared by the whole process (and so by add_features and the batch paths).
+'''
+SPELLING_CACHE_SIZE = 200000
+_spelling_cache = LRUCache(SPELLING_CACHE_SIZE)
+
+'''
+	Function to check the spelling of a word against the shared dictionary, through the spelling cache.
+	Input: a word
+	Output: True if the word is spelled correctly
+'''
+
+def check_spelling(word):
+	correct = _spelling_cache.get(word)
+	if correct is None:
+		correct = spelling_dictionary().check(word)
+		_spelling_cache.put(word, correct)
+	return correct
+
+def sentiment_analyzer():
+	global _sentiment_analyzer
+	if _sentiment_analyzer is None:
+		from nltk.sentiment.vader import SentimentIntensityAnalyzer
+		_sentiment_analyzer = SentimentIntensityAnalyzer()
+	return _sentiment_analyzer
+
+def wordnet():
+	from nltk.corpus import wordnet as wn
+	return wn
+
+'''
+	Function to split a review into sentences with NLTK's punkt tokenizer. The punkt model is loaded by the first call.
+	Input: a review (text)
+	Output: list of sentences
+'''
+
+def split_sentences(text):
+	import nltk
+	return nltk.sent_tokenize(text)
+
+'''
+	Compound VADER polarities of sentences are memoized in a bounded cache shared by the whole process,
+	since templated reviews repeat the same sentences over and over.
+'''
+SENTIMENT_CACHE_SIZE = 100000
+_sentiment_cache = LRUCache(SENTIMENT_CACHE_SIZE)
+
+'''
+	Function to score many sentences, possibly from many reviews, in one call. Sentences already in the cache are not scored again,
+	and every distinct new sentence is scored once with the shared analyzer.
+	Input: list of sentences
+	Output: list of compound polarities, in the same order
+'''
+
+def sentence_polarities(sentences):
+	polarities = [_sentiment_cache.get(sentence) for sentence in sentences]
+	scored = {}
+	sid = None
+	for sentence, polarity in zip(sentences, polarities):
+		if polarity is None and sentence not in scored:
+			if sid is None:
+				sid = sentiment_analyzer()
+			scored[sentence] = sid.polarity_scores(sentence)['compound']
+			_sentiment_cache.put(sentence, scored[sentence])
+	return [scored[sentence] if polarity is None else polarity for sentence, polarity in zip(sentences, polarities)]
+
+'''
+	Function to load the shared resources up front, e.g. when a worker process starts or before a scoring job times its first review.
+	The heavy libraries and models are otherwise only imported and loaded at their first use.
+	Input: name of the tagger backend to load (see taggers.py), resources needed (see FEATURES; all of them by default,
+	plus 'wordnet' for the WordNet index used by lexical_validity and short_sentence_similarity)
+'''
+
+def warm_up(tagger=DEFAULT_TAGGER,needs=('tags','sentences','spelling','sentiment','wordnet')):
+	common_words()
+	if 'tags' in needs:
+		pos_tagger(tagger)
+	if 'sentences' in needs:
+		split_sentences(u'Warm up.')
+	if 'wordnet' in needs:
+		wordnet().ensure_loaded()
+	if 'spelling' in needs:
+		spelling_dictionary()
+	if 'sentiment' in needs:
+		sentiment_analyzer()
+
+'''
+	Worker side of the process-pool feature extraction (see FeatureClass.add_features_batch).
+	Each worker keeps the FeatureClass object it was started with and loads the shared resources once.
+'''
+_worker_features = None
+
+def _init_worker(feature_class):
+	global _worker_features
+	_worker_features = feature_class
+	warm_up(feature_class.tagger, feature_class.needs)
+
+def _extract_chunk(texts):
+	return _worker_features.compute_features_batch(texts)
+
+'''
+	Class holding a review parsed once for all the features.
+	The review is vectorized once, and tagged and split into sentences at most once, the first time a feature needs it.
+	Every feature of FeatureClass reads from this object instead of parsing the review again.
+	Syntax-
+			<FeatureClass object>.parse(<text>)
+'''
+class ParsedReview(object):
+	
+	def __init__(self, text, tokens, tagged=None, sentences=None, tagger=DEFAULT_TAGGER):
+		self.text = text
+		self.tokens = tokens
+		self.tagger = tagger
+		self._tagged = tagged
+		self._sentences = sentences
+		self._tag_counts = None
+		self.pos_n_grams = {}
+		self.sentence_polarities = None
+	
+	@property
+	def tagged(self):
+		if self._tagged is None:
+			self._tagged = pos_tagger(self.tagger).tag(self.tokens)
+		return self._tagged
+	
+	@property
+	def sentences(self):
+		if self._sentences is None:
+			self._sentences = split_sentences(self.text)
+		return self._sentences
+	
+	@property
+	def tag_counts(self):
+		if self._tag_counts is None:
+			self._tag_counts = Counter(b for (a,b) in self.tagged)
+		return self._tag_counts
+	
+	'''
+		Function to count the terms of the review tagged with any of the given POS tags.
+		Input: tuple of POS tags
+		Output: number of terms with one of those tags
+	'''
+	
+	def count_tags(self,tags):
+		return sum(self.tag_counts[tag] for tag in tags)
+
 class FeatureClass:
 	'''
 		Possible constants for a constructor.
@@ -89,7 +316,6 @@ class FeatureClass:
 	#time_of_review
 	Photoavailable = False
 	email_address = ""
-	pos_bigrams = []
 	'''
 	def __init__(uid, title, content, star, average_rating, name_of_reviewer, location, Photoavailable, email_address):
 		self.uid = uid
@@ -102,6 +328,44 @@ class FeatureClass:
 		self.Photoavailable = Photoavailable
 		self.email_address = email_address
 	'''	
+	
+	'''
+		Constructor. With a cache_path, feature vectors are kept in an on-disk FeatureCache (see featurecache.py) and
+		add_features and add_features_batch read from it before computing anything. Its pending hits are flushed at exit.
+		tagger names the POS tagger backend (see taggers.py): the default NLTK perceptron, or e.g. 'lookup:tag_table.json'
+		for a much faster, slightly less accurate lookup table.
+		features selects the features to compute, as a list of names from FEATURES or the name of a profile in PROFILES (all by default).
+		With profile=True the object records the wall time and number of calls of every feature, and of the shared parsing steps
+		(tokens, tags, sentences), in timings. Reviews are then parsed one at a time so that every cost is measured; use workers=1.
+	'''
+	
+	def __init__(self,cache_path=None,cache_entries=2000000,tagger=DEFAULT_TAGGER,features=None,profile=False):
+		if features is None:
+			features = FEATURE_NAMES
+		elif isinstance(features, basestring):
+			features = PROFILES[features]
+		for name in features:
+			if name not in FEATURE_NEEDS:
+				raise ValueError('Unknown feature: %s' % name)
+		self.feature_names = tuple(features)
+		self.needs = frozenset(need for name in self.feature_names for need in FEATURE_NEEDS[name])
+		self.tagger = tagger
+		self.timings = {} if profile else None
+		self.cache = None
+		if cache_path is not None:
+			version = FEATURE_SET_VERSION + ':' + tagger + ':' + ','.join(self.feature_names)
+			self.cache = FeatureCache(cache_path, version, cache_entries)
+			atexit.register(self.cache.flush)
+	
+	'''
+		The cache stays with the process that opened it, so worker processes get a copy of the object without it.
+	'''
+	
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		state['cache'] = None
+		return state
+	
 	'''
 		Helper functions
 	'''
@@ -113,25 +377,10 @@ class FeatureClass:
 	'''
 	
 	def vectorize_text(self,text):
-		def remove_punctuation(text):
-			return re.sub('[,.?";:\-!@#$%^&*()]', '', text)
-		def remove_common_words(text_vector):
-			common_words = set(stopwords.words('english'))
-			common_words = common_words - set(['him','his','herself','she','hers','her','himself','he','me','myself','my'])
-			#print common_words
-			return [word for word in text_vector if word not in common_words]
-		
-		#text = text.lower()
-		#print text
-		text = remove_punctuation(text)
-		#print text
-		words_list = text.split()
-		words_list = remove_common_words(words_list)
-		#print words_list
-		return words_list
+		return textnorm.vectorize(text, lowercase=False, keep_pronouns=True)
 	
 	'''
-		Function for tagging the terms with Parts Of Speech based on NLTK POS Tagging.
+		Function for tagging the terms with Parts Of Speech, with the tagger backend of the object (NLTK POS Tagging by default).
 		Input: The review for tagging
 		Output: List of Tuples containing the term at its POS tag.
 	'''
@@ -140,134 +389,291 @@ class FeatureClass:
 		#textvector = nltk.sent_tokenize(text)
 		textvector = self.vectorize_text(text)
 		#print textvector
-		POS_tagger = nltk.pos_tag(textvector)
+		POS_tagger = pos_tagger(self.tagger).tag(textvector)
 		#POS_tagger = nltk.pos_tag_sents([nltk.word_tokenize(s) for s in textvector])
 		return POS_tagger
 	
+	'''
+		Function to parse a review once for all the features. Vectorizes the text; tagging (with a single call to the POS tagger backend)
+		and sentence splitting happen the first time a feature needs them.
+		Input: The review (text), or an already parsed review
+		Output: ParsedReview object
+	'''
+	
+	def parse(self,text):
+		if isinstance(text, ParsedReview):
+			return text
+		return ParsedReview(text, self.vectorize_text(text), tagger=self.tagger)
+	
+	'''
+		Function to parse many reviews at once. If the selected features need POS tags, all the reviews are tagged
+		with one batched call to the POS tagger backend.
+		Input: list of reviews (text)
+		Output: list of ParsedReview objects, in the same order
+	'''
+	
+	def parse_batch(self,texts):
+		texts = list(texts)
+		tokens_list = textnorm.vectorize_batch(texts, lowercase=False, keep_pronouns=True)
+		if 'tags' in self.needs:
+			tagged_list = pos_tagger(self.tagger).tag_sents(tokens_list)
+		else:
+			tagged_list = [None] * len(texts)
+		reviews = []
+		for text, tokens, tagged in zip(texts, tokens_list, tagged_list):
+			reviews.append(ParsedReview(text, tokens, tagged, tagger=self.tagger))
+		return reviews
+	
 	'''
 		Function to convert the JSON file to pandas DataFrame. Takes a review, adds all the features and returns the DataFrame
-		Input: jsonfile name
+		The file is read incrementally (see iter_feature_frames), either as a JSON array or as JSON Lines.
+		Input: open jsonfile, number of worker processes and reviews per chunk (see add_features_batch),
+		reviews read per batch, optional maximum number of reviews
 		Output: Pandas DataFrame containing features of each review.
 		
 	'''
 	
-	def json_to_pddata(self,jsonfile):
-		json_text = json.load(jsonfile)
-		#b = pd.DataFrame(json_text)
-		features = []
-		index = 1
-		for items in json_text:
-			if index <= 20000:
-				features.append(self.add_features(items['content']))
-				index += 1
-			else:
-				break
-		df = pd.DataFrame(features)
-		return df
+	def json_to_pddata(self,jsonfile,workers=1,chunk_size=100,batch_size=10000,limit=None):
+		import pandas as pd
+		frames = list(self.iter_feature_frames(jsonfile, workers, chunk_size, batch_size, limit))
+		if not frames:
+			return pd.DataFrame(columns=self.feature_names)
+		return pd.concat(frames)
 	
 	'''
-		Function to add features to the review to add to the DataFrame.
+		Function to stream the features of a JSON dump. The reviews are read batch_size at a time with iter_json_items,
+		so only one batch is ever held in memory. With workers other than 1 one pool of worker processes (see worker_pool)
+		serves every batch, and is closed when the generator finishes.
+		Input: open jsonfile (JSON array or JSON Lines of items with a 'content' field), number of worker processes,
+		reviews per chunk, reviews per batch, optional maximum number of reviews
+		Output: generator of DataFrames with the features of each batch, indexed by the position of the review in the file
+	'''
+	
+	def iter_feature_frames(self,jsonfile,workers=1,chunk_size=100,batch_size=10000,limit=None):
+		import pandas as pd
+		items = iter_json_items(jsonfile)
+		if limit is not None:
+			items = islice(items, limit)
+		pool = self.worker_pool(workers) if workers != 1 else None
+		try:
+			start = 0
+			while True:
+				contents = [item['content'] for item in islice(items, batch_size)]
+				if not contents:
+					break
+				matrix, feature_names = self.add_features_batch(contents, workers, chunk_size, pool)
+				yield pd.DataFrame(matrix, columns=feature_names, index=range(start, start + len(contents)))
+				start += len(contents)
+		finally:
+			if pool is not None:
+				pool.close()
+				pool.join()
+	
+	'''
+		Function to write the features of a JSON dump to a CSV file as they are computed, batch by batch.
+		Input: open jsonfile, open csvfile, and the options of iter_feature_frames
+		Output: number of reviews written
+	'''
+	
+	def json_to_csv(self,jsonfile,csvfile,workers=1,chunk_size=100,batch_size=10000,limit=None):
+		written = 0
+		for frame in self.iter_feature_frames(jsonfile, workers, chunk_size, batch_size, limit):
+			frame.to_csv(csvfile, header=(written == 0), index_label='review')
+			written += len(frame)
+		return written
+	
+	'''
+		Function to add features to the review to add to the DataFrame. Uses the cache when the object has one.
 		Input: The review
 		Output: dictionary containing features wrt the content for the DataFrame.
 	'''	 
 	
 	def add_features(self,content):
+		if self.cache is None:
+			return self.compute_features(content)
+		text = content.text if isinstance(content, ParsedReview) else content
+		vector = self.cache.get_many([text])[0]
+		if vector is not None:
+			return dict((name, float(value)) for name, value in zip(self.feature_names, vector))
+		feature_vector = self.compute_features(content)
+		self.cache.put_many([text], [[feature_vector[name] for name in self.feature_names]])
+		return feature_vector
+	
+	'''
+		Function to compute the selected features of a review, without looking at the cache.
+		Input: The review
+		Output: dictionary containing features wrt the content
+	'''
+	
+	def compute_features(self,content):
 		feature_vector = {}
-		feature_vector["percentnouns"] = self.percentnouns(content)
-		feature_vector["percentverbs"] = self.percentverbs(content)
-		feature_vector["percentpronouns"] = self.percentpronouns(content)
-		feature_vector["modalverbsratio"] = self.modalverbsratio(content)
-		feature_vector["capitalized_diversity"] = self.capitalized_diversity(content)
-		feature_vector["repeated_tokens"] = self.repeated_tokens(content)
-		feature_vector["emotiveness_diversity"] = self.emotiveness_diversity(content)
-		feature_vector["spelling_check"] = self.spelling_check(content)
-		feature_vector["self_reference_diversity"] = self.self_reference_diversity(content)
-		#feature_vector["lexical_validity"] = self.lexical_validity(content)
-		feature_vector["text_orientation"] = self.text_orientation(content)
-		feature_vector["sentiment_orientation"] = self.sentiment_orientation(content)
-		feature_vector["lexical_diversity"] = self.lexical_diversity(content)
-		feature_vector["content_diversity"] = self.content_diversity(content)
-		feature_vector["pos_n_grams_diversity"] = self.pos_n_grams_diversity(content)
-		feature_vector["lexical_entropy"] = self.lexical_entropy(content)
+		if self.timings is None:
+			content = self.parse(content)
+			for name in self.feature_names:
+				feature_vector[name] = getattr(self, name)(content)
+			return feature_vector
+		content = self.timed('tokens', self.parse, content)
+		if 'tags' in self.needs:
+			self.timed('tags', lambda: content.tagged)
+		if 'sentences' in self.needs:
+			self.timed('sentences', lambda: content.sentences)
+		for name in self.feature_names:
+			feature_vector[name] = self.timed(name, getattr(self, name), content)
 		return feature_vector
 	
+	'''
+		Function to call a function and add its wall time and one call to timings[name]. Used in profile mode.
+		Input: name to record the time under, function and its arguments
+		Output: the result of the function
+	'''
+	
+	def timed(self,name,function,*args):
+		start = time.time()
+		result = function(*args)
+		seconds, calls = self.timings.get(name, (0.0, 0))
+		self.timings[name] = (seconds + time.time() - start, calls + 1)
+		return result
+	
+	'''
+		Function to add features to many reviews at once. Reviews found in the cache are not computed again.
+		With workers other than 1 the remaining reviews are split into chunks of chunk_size and spread over a pool of worker processes
+		(workers=None uses every core), or over the given pool. Rows always come back in the order of the input.
+		Input: list of reviews, number of worker processes, reviews per chunk, optional pool from worker_pool
+		Output: tuple of a float32 NumPy matrix with one row per review and the feature names of its columns
+	'''
+	
+	def add_features_batch(self,texts,workers=1,chunk_size=100,pool=None):
+		texts = list(texts)
+		matrix = np.zeros((len(texts), len(self.feature_names)), dtype=np.float32)
+		missing = list(range(len(texts)))
+		if self.cache is not None:
+			vectors = self.cache.get_many(texts)
+			missing = [row for row, vector in enumerate(vectors) if vector is None]
+			for row, vector in enumerate(vectors):
+				if vector is not None:
+					matrix[row] = vector
+		if missing:
+			missing_texts = [texts[row] for row in missing]
+			if workers == 1 and pool is None:
+				computed = self.compute_features_batch(missing_texts)
+			else:
+				computed = self.compute_features_parallel(missing_texts, workers, chunk_size, pool)
+			matrix[missing] = computed
+			if self.cache is not None:
+				self.cache.put_many(missing_texts, computed)
+		return matrix, self.feature_names
+	
+	'''
+		Function to compute the features of many reviews in this process, without looking at the cache.
+		Input: list of reviews
+		Output: float64 NumPy matrix with one row per review and columns in the order of the feature names
+	'''
+	
+	def compute_features_batch(self,texts):
+		if self.timings is not None:
+			reviews = list(texts)
+		else:
+			reviews = self.parse_batch(texts)
+			if 'sentiment' in self.needs:
+				self.sentiment_orientation_batch(reviews)
+		matrix = np.zeros((len(reviews), len(self.feature_names)))
+		for row, review in enumerate(reviews):
+			features = self.compute_features(review)
+			matrix[row] = [features[name] for name in self.feature_names]
+		return matrix
+	
+	'''
+		Function to start a pool of worker processes for the object. Every worker loads the resources of the features once
+		(see warm_up), so a pool reused for many batches pays that only once. The caller closes the pool.
+		Input: number of worker processes (None for every core)
+		Output: multiprocessing Pool
+	'''
+	
+	def worker_pool(self,workers=None):
+		return multiprocessing.Pool(workers, _init_worker, (self,))
+	
+	'''
+		Function to compute the features of many reviews with a pool of worker processes. Used by add_features_batch.
+		Without a pool, one is started for the call and closed after it.
+		Input: list of reviews, number of worker processes (None for every core), reviews per chunk, optional pool from worker_pool
+		Output: same as compute_features_batch
+	'''
+	
+	def compute_features_parallel(self,texts,workers=None,chunk_size=100,pool=None):
+		texts = list(texts)
+		chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+		if not chunks:
+			return np.zeros((0, len(self.feature_names)))
+		if pool is not None:
+			return np.vstack(pool.map(_extract_chunk, chunks))
+		pool = self.worker_pool(workers)
+		try:
+			matrices = pool.map(_extract_chunk, chunks)
+		finally:
+			pool.close()
+			pool.join()
+		return np.vstack(matrices)
+	
 	'''
 		Syntactical features
 	'''	
 	
 	'''
 		Function to find the percentage of nouns in a review.
-		Calls the function pos_tagging to vectorize the review and tag the terms with Part of Speech tags. 
+		Reads the Part of Speech tags from the parsed review (see parse).
 		Input: Review in question
 		Output: percentage of nouns in a review
 	'''
 	
 	def percentnouns(self,text):
-		vectorised_text = self.pos_tagging(text)
-		nouns = 0
-		for i, (a,b) in enumerate(vectorised_text):
-			if b == 'NN' or b == 'NNS' or b == 'NNP' or b == 'NNPS':
-				#print b
-				nouns += 1
-		#print nouns
+		review = self.parse(text)
+		nouns = review.count_tags(NOUN_TAGS)
 		try:
-			return (float)(nouns)/(float)(len(vectorised_text))
+			return (float)(nouns)/(float)(len(review.tagged))
 		except ZeroDivisionError:
 			return 0
 	
 	'''
 		Function to find the percentage of verbs in a review.
-		Calls the function pos_tagging to vectorize the review and tag the terms with Part of Speech tags. 
+		Reads the Part of Speech tags from the parsed review (see parse).
 		Input: Review in question
 		Output: percentage of verbs in a review
 	'''		
 	
 	def percentverbs(self,text):
-		vectorised_text = self.pos_tagging(text)
-		verb = 0
-		for i, (a,b) in enumerate(vectorised_text):
-			if b == 'VB' or b == 'VBD' or b == 'VBG' or b == 'VBN' or b == 'VBP' or b == 'VBZ':
-				verb += 1
+		review = self.parse(text)
+		verb = review.count_tags(VERB_TAGS)
 		try:
-			return (float)(verb)/(float)(len(vectorised_text))
+			return (float)(verb)/(float)(len(review.tagged))
 		except ZeroDivisionError:
 			return 0
 	
 	'''
 		Function to find the percentage of pronouns in a review.
-		Calls the function pos_tagging to vectorize the review and tag the terms with Part of Speech tags. 
+		Reads the Part of Speech tags from the parsed review (see parse).
 		Input: Review in question
 		Output: percentage of pronouns in a review
 	'''		
 	
 	def percentpronouns(self,text):
-		vectorised_text = self.pos_tagging(text)
-		pronoun = 0
-		for i, (a,b) in enumerate(vectorised_text):
-			if b == 'PRP' or b == 'PRP$':
-				pronoun += 1
-		#print pronoun
+		review = self.parse(text)
+		pronoun = review.count_tags(PRONOUN_TAGS)
 		try:
-			return (float)(pronoun)/(float)(len(vectorised_text))
+			return (float)(pronoun)/(float)(len(review.tagged))
 		except ZeroDivisionError:
 			return 0
 	
 	'''
 		Function to find the ratio of modals to verbs in a review.
-		Calls the function pos_tagging to vectorize the review and tag the terms with Part of Speech tags. 
+		Reads the Part of Speech tags from the parsed review (see parse).
 		Input: Review in question
 		Output: ratio of modals to verbs in a review
 	'''
 			
 	def modalverbsratio(self,text):
-		vectorised_text = self.pos_tagging(text)
-		modals = 0
-		verbs = 0
-		for i,(a,b) in enumerate(vectorised_text):
-			if b == 'MD':
-				modals += 1
-			elif b == 'VB' or b == 'VBD' or b == 'VBG' or b == 'VBN' or b == 'VBP':
-				verbs += 1
+		review = self.parse(text)
+		modals = review.count_tags(('MD',))
+		verbs = review.count_tags(('VB','VBD','VBG','VBN','VBP'))
 		try:
 			return (float)(modals)/(float)(verbs)
 		except ZeroDivisionError:
@@ -279,13 +685,13 @@ class FeatureClass:
 	
 	'''
 		Function to calculate the ratio of words with first letter caps to all the words in a review.
-		The function vectorizes the text and then calculates the ratio.
+		The function reads the vectorized text from the parsed review and then calculates the ratio.
 		Input: The Review in question
 		Output: The ratio of words with first letter caps to all the words
 	'''
 	
 	def capitalized_diversity(self,text):
-		vectorised_text = self.vectorize_text(text)
+		vectorised_text = self.parse(text).tokens
 		caps = 0.0
 		for tokens in vectorised_text:
 			if tokens[0].isupper():
@@ -298,13 +704,13 @@ class FeatureClass:
 	
 	'''
 		Function for calculating the ratio of repeated tokens to all the tokens in the review.
-		The function vectorizes the text and then calculates the ratio.
+		The function reads the vectorized text from the parsed review and then calculates the ratio.
 		Input: The Review in question
 		Output: The ratio of repeated tokens to all the tokens in the review
 	'''
 	
 	def repeated_tokens(self,text):
-		vectorised_text = self.vectorize_text(text)
+		vectorised_text = self.parse(text).tokens
 		temp = set(vectorised_text)
 		#print temp
 		try:
@@ -314,27 +720,17 @@ class FeatureClass:
 	
 	'''
 		Function to calculate the ratio of number of adjectives + adverbs to the number of verbs and nouns.
-		The function vectorizes the text and then calculates the ratio.
+		The function reads the vectorized text from the parsed review and then calculates the ratio.
 		Input: The Review in question
 		Output: The ratio of (adjectives + adverbs) to (nouns + verbs)
 	'''
 			
 	def emotiveness_diversity(self,text):
-		pos_text = self.pos_tagging(text)
-		adjectives = 0
-		adverbs = 0
-		nouns = 0
-		verb = 0
-		for i,(a,b) in enumerate(pos_text):
-			if b == 'VB' or b == 'VBD' or b == 'VBG' or b == 'VBN' or b == 'VBP' or b == 'VBZ':
-				verb += 1
-			elif b == 'NN' or b == 'NNS' or b == 'NNP' or b == 'NNPS':
-				nouns += 1
-			elif b == 'JJ' or b == 'JJS' or b == 'JJR':
-				adjectives += 1
-			elif b == 'RB' or b == 'RBS' or b == 'RBR':
-				adverbs += 1
-		#print adjectives + adverbs
+		review = self.parse(text)
+		adjectives = review.count_tags(ADJECTIVE_TAGS)
+		adverbs = review.count_tags(ADVERB_TAGS)
+		nouns = review.count_tags(NOUN_TAGS)
+		verb = review.count_tags(VERB_TAGS)
 		try:
 			return (float)(adjectives + adverbs)/(float)(verb + nouns)
 		except ZeroDivisionError:
@@ -343,17 +739,17 @@ class FeatureClass:
 	'''
 		Function to calculate the ratio of spelling errors to the number of words in the review. Uses the python enchant library.
 		If a word doesn't exist in the dictionary, it is assumed to be an error. Nouns are excluded of course.
+		Lookups go through check_spelling, so every distinct word is checked against the dictionary only once.
 		Input: The review in question
 		Output: The ratio of spelling errors to number of words.
 	'''
 	
 	def spelling_check(self,text):
-		d = enchant.Dict("en_GB")
-		list_of_words = self.pos_tagging(text)
+		list_of_words = self.parse(text).tagged
 		errors = 0
 		for i,(a,b) in enumerate(list_of_words):
-			if d.check(a) == False:
-				if (b == 'NN' or (b == 'NNS' or (b == 'NNP' or (b == 'NNPS')))):
+			if check_spelling(a) == False:
+				if b in NOUN_TAGS:
 					continue
 				else:
 					errors += 1
@@ -364,21 +760,15 @@ class FeatureClass:
 	
 	'''
 		Function to calculate the ratio of Personal Pronouns to the number of pronouns in a review.
-		The function vectorizes the text and then calculates the ratio.
+		The function reads the vectorized text from the parsed review and then calculates the ratio.
 		Input: The Review in question
 		Output: The ratio of Personal Pronouns to the number of Pronouns
 	'''
 			
 	def self_reference_diversity(self,text):
-		pos_text = self.pos_tagging(text)
-		personal_pronoun = 0
-		for i, (a,b) in enumerate(pos_text):
-			if b == 'PRP':
-				personal_pronoun += 1
-		pronoun = 0
-		for i, (a,b) in enumerate(pos_text):
-			if b == 'PRP' or b == 'PRP$':
-				pronoun += 1
+		review = self.parse(text)
+		personal_pronoun = review.count_tags(('PRP',))
+		pronoun = review.count_tags(PRONOUN_TAGS)
 		try:
 			return (float)(personal_pronoun)/(float)(pronoun)
 		except ZeroDivisionError:
@@ -397,10 +787,10 @@ class FeatureClass:
 	
 	def lexical_validity(self,text):
 		
-		list_of_words = self.vectorize_text(text)
+		list_of_words = self.parse(text).tokens
 		valid = 0
 		for word in list_of_words:
-			sysnet = wn.synsets(word)
+			sysnet = wordnet().synsets(word)
 			if len(sysnet) >= 0:
 				valid += 1
 		try:
@@ -418,7 +808,7 @@ class FeatureClass:
 	'''
 	
 	def text_orientation(self,text):
-		vectorised_text = self.vectorize_text(text)
+		vectorised_text = self.parse(text).tokens
 		illegal = 0
 		for words in vectorised_text:
 			#if set('[~!@#$%^&*()_+{}":;\']+$').intersection(words):
@@ -434,24 +824,40 @@ class FeatureClass:
 	
 	'''
 		Function to find the reviews polarity. Uses NLTK's Vader Intensity Analyzer to find the polarity of the sentence. Positive polarity indicates positive sentiment and negative indicates negative sentiment.
-		Neutral is given 0 score.
+		Neutral is given 0 score. Sentences are scored through sentence_polarities, so the analyzer is built once per process.
 		Input: The review in question
 		Output: The polarity of the review. Takes average of all the sentences' polarity.
 	'''
 			
 	def sentiment_orientation(self,text):
-		lines_list = nltk.sent_tokenize(text)
-		sid = SentimentIntensityAnalyzer()
+		review = self.parse(text)
+		if review.sentence_polarities is None:
+			review.sentence_polarities = sentence_polarities(review.sentences)
 		temp = 0.0
-		for sentence in lines_list:
-			#print sentence
-			ss = sid.polarity_scores(sentence)
-			temp += ss['compound']
+		for polarity in review.sentence_polarities:
+			temp += polarity
 		try:
-			return temp/(float)(len(lines_list))
+			return temp/(float)(len(review.sentence_polarities))
 		except ZeroDivisionError:
 			return 0
 	
+	'''
+		Function to find the polarity of many reviews at once. The sentences of all the reviews are scored with one call
+		to sentence_polarities, and each review's polarity is the average of its sentences' polarity as in sentiment_orientation.
+		Input: list of reviews
+		Output: list of polarities, in the same order
+	'''
+	
+	def sentiment_orientation_batch(self,texts):
+		reviews = [self.parse(text) for text in texts]
+		pending = [review for review in reviews if review.sentence_polarities is None]
+		polarities = sentence_polarities([sentence for review in pending for sentence in review.sentences])
+		start = 0
+		for review in pending:
+			review.sentence_polarities = polarities[start:start + len(review.sentences)]
+			start += len(review.sentences)
+		return [self.sentiment_orientation(review) for review in reviews]
+	
 	'''
 		Function to find the lexical diversity in a review. Lexical diversity is the ratio of the
 		number of unique words to the number of all words in the review.
@@ -460,7 +866,7 @@ class FeatureClass:
 	'''
 	
 	def lexical_diversity(self,text):
-		list_of_words = text.split()
+		list_of_words = self.parse(text).text.split()
 		unique_words = set(list_of_words)
 		#print unique_words
 		try:
@@ -471,24 +877,24 @@ class FeatureClass:
 	'''
 		Function to find the content diversity in a review. Content diversity is the ratio of
 		the number of unique nouns and unique verbs to the number of all nouns and verbs presented in a review.
-		Calls the function pos_tagging to vectorize the review and tag the terms with Part of Speech tags. 
+		Reads the Part of Speech tags from the parsed review (see parse).
 		Input: The review in question
 		Output: Ratio of (unique nouns + verbs) to the (nouns + verbs)
 	'''
 			
 	def content_diversity(self,text):
-		pos_text = self.pos_tagging(text)
+		pos_text = self.parse(text).tagged
 		verb = 0
 		noun = 0
 		nouns =[]
 		verbs = []
 		for i,(a,b) in enumerate(pos_text):
-			if b == 'VB' or b == 'VBD' or b == 'VBG' or b == 'VBN' or b == 'VBP' or b == 'VBZ':
+			if b in VERB_TAGS:
 				verb += 1
-				nouns.append(a)
-			elif b == 'NN' or b == 'NNS' or b == 'NNP' or b == 'NNPS':
-				noun += 1
 				verbs.append(a)
+			elif b in NOUN_TAGS:
+				noun += 1
+				nouns.append(a)
 		nouns = set(nouns)
 		verbs = set(verbs)
 		try:
@@ -498,59 +904,47 @@ class FeatureClass:
 		# ratio of unique nouns, verbs to number of all nouns and verbs
 	
 	'''
-		Function to find the diversity of POS bigrams. POS bigrams have the form (noun, verb), (adjective, noun), (adverb, adjective), etc.
-		POS bigram diversity is the ratio of the number of different POS bigrams to the total number of POS bigrams.
-		Calls the function pos_tagging to vectorize the review and tag the terms with Part of Speech tags. 
-		Input: The review in question
-		Output: ratio of the number of different POS bigrams to the total number of POS bigrams.
+		Function to find the POS n-grams of a review, e.g. POS bigrams of the form (noun, verb), (adjective, noun), (adverb, adjective).
+		The n-grams are read off the tags of the parsed review, which were assigned once with the whole review as context,
+		and are counted in a single pass. The counts are kept on the parsed review, so nothing is shared between reviews.
+		Input: The review in question, order n of the n-grams
+		Output: Counter of the POS n-grams of the review
 	'''
 	
-	def pos_n_grams_diversity(self,text):
-		def remove_punctuation(text):
-			return re.sub('[,.?";:\-!@#$%^&*()]', '', text)
-		
-		bigram_measures = nltk.collocations.BigramAssocMeasures()
-		text = remove_punctuation(text)
-		tokens = nltk.wordpunct_tokenize(text)
-		finder = BigramCollocationFinder.from_words(tokens)
-		scored = finder.score_ngrams(bigram_measures.raw_freq)
-		bigrams = sorted(bigram for bigram, score in scored)
-		
-		'''
-			more efficient way for this
-		'''
-		for i, (a,b) in enumerate(bigrams):
-			c = nltk.pos_tag([a])
-			d = nltk.pos_tag([b])
-			c = dict(c)
-			d = dict(d)
-			#print c.values(), d.values()
-			self.pos_bigrams.append(tuple((c.values()[0],d.values()[0])))
+	def pos_n_grams(self,text,n=2):
+		review = self.parse(text)
+		if n not in review.pos_n_grams:
+			tags = [b for (a,b) in review.tagged]
+			review.pos_n_grams[n] = Counter(tuple(tags[i:i + n]) for i in range(len(tags) - n + 1))
+		return review.pos_n_grams[n]
+	
+	'''
+		Function to find the diversity of POS n-grams (bigrams by default).
+		POS n-gram diversity is the ratio of the number of different POS n-grams to the total number of POS n-grams.
+		Calls the function pos_n_grams to count the POS n-grams of the review.
+		Input: The review in question, order n of the n-grams
+		Output: ratio of the number of different POS n-grams to the total number of POS n-grams.
+	'''
+	
+	def pos_n_grams_diversity(self,text,n=2):
+		frequencies = self.pos_n_grams(text, n)
 		try:
-			return (float)(len(set(self.pos_bigrams)))/(float)(len(self.pos_bigrams))
+			return (float)(len(frequencies))/(float)(sum(frequencies.values()))
 		except ZeroDivisionError:
 			return 0
 	
 	'''
-		Function to calculate lexical entropy.
-		Input - text
+		Function to calculate lexical entropy, the entropy of the distribution of POS n-grams (bigrams by default) in the review.
+		Input - text, order n of the n-grams
 		Output - lexical entropy
 	'''
 	
-	def lexical_entropy(self,text):
-		
-		d = {}
-		frequencies = Counter(elem for elem in self.pos_bigrams)
-		for key, value in frequencies.items():
-			d[key] = value
+	def lexical_entropy(self,text,n=2):
+		frequencies = self.pos_n_grams(text, n)
+		total = sum(frequencies.values())
 		sum1 = 0
-		for key,value in d.iteritems():
-			sum1 += -(((float)(value)/(float)(len(self.pos_bigrams))) * math.log((float)(value)/(float)(len(self.pos_bigrams)),2))
-			#print key, value, len(self.pos_bigrams)
-			#print ((float)(value)/(float)(len(self.pos_bigrams)))
-			#print math.log((float)(value)/(float)(len(self.pos_bigrams)),2)
-			#print math.log((float)(value)/(float)(len(self.pos_bigrams)),10)
-			#print '\n'
+		for key,value in frequencies.iteritems():
+			sum1 += -(((float)(value)/(float)(total)) * math.log((float)(value)/(float)(total),2))
 		return sum1
 #something = FeatureClass()
 #jsonfile = open(argv[1],'r')
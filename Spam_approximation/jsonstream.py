@@ -0,0 +1,90 @@
+'''
+	Script containing the incremental JSON reader used to ingest scrape dumps.
+	Reads the elements of a top-level JSON array, or the values of a JSON Lines file, one at a time, so a dump of any size
+	is processed in bounded memory.
+	Syntax-
+			for item in iter_json_items(<open file>):
+				...
+'''
+
+'''
+	Dependencies. The different libraries used -
+	1> JSON
+	2> CODECS
+'''
+import json
+import codecs
+
+'''
+	Number of characters read from the file at a time.
+'''
+READ_SIZE = 1 << 16
+
+'''
+	Function to iterate over the items of a JSON dump without loading the whole file.
+	The format is detected from the first character: '[' for a JSON array, anything else for JSON Lines
+	(one value per line, or more generally whitespace-separated values).
+	Input: open file (text or binary, UTF-8)
+	Output: generator of the decoded items, in file order
+'''
+
+def iter_json_items(jsonfile, read_size=READ_SIZE):
+	decoder = json.JSONDecoder()
+	text_decoder = codecs.getincrementaldecoder('utf-8')()
+	state = {'eof': False}
+
+	def read():
+		chunk = jsonfile.read(read_size)
+		if not chunk:
+			state['eof'] = True
+			return text_decoder.decode(b'', final=True)
+		if isinstance(chunk, bytes):
+			chunk = text_decoder.decode(chunk)
+		return chunk
+
+	buffer = u''
+	pos = 0
+	while True:
+		while pos < len(buffer) and buffer[pos].isspace():
+			pos += 1
+		if pos < len(buffer) or state['eof']:
+			break
+		buffer = read()
+		pos = 0
+	if pos >= len(buffer):
+		return
+	in_array = buffer[pos] == '['
+	if in_array:
+		pos += 1
+
+	while True:
+		# skip the whitespace (and in an array the comma) before the next item
+		while True:
+			while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ',')):
+				pos += 1
+			if pos < len(buffer) or state['eof']:
+				break
+			buffer = read()
+			pos = 0
+		if pos >= len(buffer):
+			if in_array:
+				raise ValueError('Unterminated JSON array')
+			return
+		if in_array and buffer[pos] == ']':
+			return
+		# decode the item, reading more of the file while it is incomplete
+		while True:
+			try:
+				item, end = decoder.raw_decode(buffer, pos)
+			except ValueError:
+				if state['eof']:
+					raise
+				item, end = None, None
+			# a number cut by the end of the buffer also decodes, so the item must be followed by a delimiter
+			if end is not None and (state['eof'] or (end < len(buffer) and (buffer[end].isspace() or buffer[end] in ',]'))):
+				break
+			buffer = buffer[pos:] + read()
+			pos = 0
+		yield item
+		buffer = buffer[end:]
+		pos = 0
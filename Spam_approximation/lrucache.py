@@ -0,0 +1,78 @@
+'''
+	Script containing a small bounded in-memory cache with least recently used eviction.
+	Used to memoize pure lookups (spelling checks, word similarities, review models) that repeat a lot across reviews.
+	Syntax-
+			<object_name> = LRUCache(<maxsize>)
+			<object_name>.get(<key>)
+			<object_name>.put(<key>, <value>)
+'''
+
+'''
+	Dependencies of the class. The different libraries used -
+	1> COLLECTIONS
+	2> THREADING
+'''
+from collections import OrderedDict
+import threading
+
+class LRUCache:
+
+	'''
+		Constructor. The cache holds at most maxsize entries.
+	'''
+
+	def __init__(self, maxsize=100000):
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self.entries = OrderedDict()
+		self.lock = threading.Lock()
+
+	'''
+		Function to look up a key. The entry found becomes the most recently used one.
+		Input: key, value to return when the key is missing
+		Output: cached value or default
+	'''
+
+	def get(self, key, default=None):
+		with self.lock:
+			try:
+				value = self.entries.pop(key)
+			except KeyError:
+				self.misses += 1
+				return default
+			self.entries[key] = value
+			self.hits += 1
+			return value
+
+	'''
+		Function to store a value, evicting the least recently used entry when the cache is full.
+		Input: key and value
+		Output: none
+	'''
+
+	def put(self, key, value):
+		with self.lock:
+			self.entries.pop(key, None)
+			self.entries[key] = value
+			if len(self.entries) > self.maxsize:
+				self.entries.popitem(last=False)
+
+	def __contains__(self, key):
+		return key in self.entries
+
+	def __len__(self):
+		return len(self.entries)
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+
+	'''
+		Function to return the hit and miss counters of the cache.
+		Input: none
+		Output: dictionary with hits, misses and the number of cached entries
+	'''
+
+	def stats(self):
+		return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
@@ -0,0 +1,144 @@
+'''
+	Script containing the MinHash signatures and locality sensitive hashing (LSH) used to find the candidate pairs of similar
+	reviews, so that only those pairs get the divergence score of UntruthfulSpam instead of all N^2 pairs.
+	The signature of a review estimates the Jaccard similarity of its set of shingles (runs of shingle_size consecutive terms)
+	with any other review: the fraction of equal signature values. Signatures are cut into bands of rows, and two reviews are
+	a candidate pair when all the rows of one band are equal, which happens with probability 1 - (1 - J^rows)^bands for a
+	Jaccard similarity J. The threshold of the LSH, where that probability rises fastest, is about (1 / bands)^(1 / rows).
+	The defaults (word 3-gram shingles, 20 bands of 6 rows) put it at J = 0.61: pairs of reviews sharing most of their
+	3-grams (copies, edited copies, templates) are candidates with probability above 0.9 from J = 0.7 on, and pairs
+	that merely share vocabulary, whose 3-gram Jaccard similarity is mostly below 0.1, are candidates with probability
+	below 0.0001. Buckets with more than max_bucket reviews (boilerplate shared by a large part of the collection) are dropped,
+	so a band never produces more than max_bucket^2 / 2 pairs per bucket.
+	Syntax-
+			<object_name> = MinHashLSH(<number of hash functions>, <number of bands>, <shingle size>)
+			<object_name>.signatures(<list of term lists>)
+			<object_name>.candidate_pairs(<signatures>, <valid reviews>, <maximum bucket size>)
+'''
+
+'''
+	Dependencies of the class. The different libraries used -
+	1> NUMPY
+	2> ZLIB
+'''
+import numpy as np
+import zlib
+
+'''
+	Default number of hash functions, bands, shingle size and maximum bucket size. The hash functions are (a * x + b) mod PRIME
+	of the CRC32 of the shingles, with a and b drawn from a fixed seed so that signatures of different runs can be compared.
+'''
+NUM_HASHES = 120
+BANDS = 20
+SHINGLE_SIZE = 3
+MAX_BUCKET = 1000
+PRIME = (1 << 31) - 1
+SEED = 1
+
+class MinHashLSH:
+
+	'''
+		Constructor. num_hashes must be a multiple of bands.
+	'''
+
+	def __init__(self, num_hashes=NUM_HASHES, bands=BANDS, shingle_size=SHINGLE_SIZE, seed=SEED):
+		if num_hashes % bands != 0:
+			raise ValueError("num_hashes must be a multiple of bands")
+		self.num_hashes = num_hashes
+		self.bands = bands
+		self.rows = num_hashes // bands
+		self.shingle_size = shingle_size
+		generator = np.random.RandomState(seed)
+		self.a = generator.randint(1, PRIME, num_hashes).astype(np.int64)
+		self.b = generator.randint(0, PRIME, num_hashes).astype(np.int64)
+
+	'''
+		Function to hash the shingles of a review.
+		Input: list of terms
+		Output: NumPy array of the distinct shingle hashes, below PRIME
+	'''
+
+	def shingles(self, words):
+		words = [word.encode('utf-8') if isinstance(word, unicode) else word for word in words]
+		shingles = set(' '.join(words[i:i + self.shingle_size]) for i in range(max(len(words) - self.shingle_size + 1, 0)))
+		return np.array([zlib.crc32(shingle) & 0xffffffff for shingle in shingles], dtype=np.int64) % PRIME
+
+	'''
+		Function to compute the MinHash signature of a review.
+		Input: list of terms
+		Output: NumPy array of num_hashes values, or None if the review has no shingle
+	'''
+
+	def signature(self, words):
+		hashes = self.shingles(words)
+		if len(hashes) == 0:
+			return None
+		return ((np.outer(self.a, hashes) + self.b[:, np.newaxis]) % PRIME).min(axis=1)
+
+	'''
+		Function to compute the signatures of many reviews.
+		Input: list of term lists
+		Output: num_reviews x num_hashes NumPy array of signatures, and boolean array of the reviews that have one
+	'''
+
+	def signatures(self, word_lists):
+		signatures = np.zeros((len(word_lists), self.num_hashes), dtype=np.int64)
+		valid = np.zeros(len(word_lists), dtype=bool)
+		for i, words in enumerate(word_lists):
+			signature = self.signature(words)
+			if signature is not None:
+				signatures[i] = signature
+				valid[i] = True
+		return signatures, valid
+
+	'''
+		Function to compute the band keys of the signatures: each band is hashed to one 64 bit key per review.
+		Input: num_reviews x num_hashes NumPy array of signatures
+		Output: num_reviews x bands NumPy array of keys
+	'''
+
+	def band_keys(self, signatures):
+		keys = np.zeros((len(signatures), self.bands), dtype=np.uint64)
+		for band in range(self.bands):
+			rows = signatures[:, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+			for row in range(self.rows):
+				keys[:, band] = keys[:, band] * np.uint64(1000003) + rows[:, row]
+		return keys
+
+	'''
+		Function to find the candidate pairs: reviews whose signatures are equal over at least one band. Pairs are streamed
+		band by band, and bucket by bucket, instead of being collected first. A pair is given only by the first band
+		where its reviews have the same key, which is checked on the keys of the earlier bands, so no set of the pairs is kept.
+		Input: signatures and valid reviews (see signatures), maximum bucket size (None to keep every bucket)
+		Output: generator of the candidate pairs (i, j), i < j, each given once, sorted within a bucket
+	'''
+
+	def candidate_pairs(self, signatures, valid=None, max_bucket=MAX_BUCKET):
+		if valid is None:
+			valid = np.ones(len(signatures), dtype=bool)
+		reviews = np.flatnonzero(valid)
+		keys = self.band_keys(signatures[reviews])
+		for band in range(self.bands):
+			order = np.argsort(keys[:, band], kind='mergesort')
+			starts = np.flatnonzero(np.diff(keys[order, band])) + 1
+			starts = np.concatenate(([0], starts))
+			sizes = np.diff(np.concatenate((starts, [len(order)])))
+			shared = (sizes > 1) if max_bucket is None else (sizes > 1) & (sizes <= max_bucket)
+			for start, size in zip(starts[shared].tolist(), sizes[shared].tolist()):
+				bucket = np.sort(order[start:start + size])
+				first, second = np.triu_indices(size, 1)
+				first, second = bucket[first], bucket[second]
+				if band > 0:
+					new = ~(keys[first, :band] == keys[second, :band]).any(axis=1)
+					first, second = first[new], second[new]
+				for i, j in zip(reviews[first].tolist(), reviews[second].tolist()):
+					yield i, j
+
+	'''
+		Function to estimate the Jaccard similarity of the shingle sets of two reviews from their signatures.
+		Input: two signatures
+		Output: fraction of equal signature values
+	'''
+
+	def jaccard(self, signature_1, signature_2):
+		return float(np.mean(signature_1 == signature_2))
@@ -0,0 +1,286 @@
+'''
+	Script containing the term relationship matrix R used by UntruthfulSpam.P_semantic, which is also the word similarity table
+	read by short_sentence_similarity.
+	R[t1,t2] is the association probability of two terms of the corpus vocabulary, their word similarity (short_sentence_similarity),
+	kept only when it reaches the cutoff. R is a sparse CSR matrix of float16 values with an index of its vocabulary, built once,
+	offline and in parallel, over the vocabulary of the op_spam and hotel review corpora. It is stored in a directory as .npy files
+	that are memory mapped when loaded, so every scoring process shares the same pages. Terms are found by binary search in
+	the sorted vocabulary, so loading builds no index in memory.
+	|R| is the number of term relationships, i.e. the number of distinct pairs of different terms kept in the matrix. R is stored
+	symmetric with its diagonal, so |R| is (entries - diagonal entries) / 2. It is counted when the matrix is built and saved with it.
+	Syntax-
+			python semantic_matrix.py [<output directory>] [<cutoff, default 0.1>] [<corpus> ...]
+				a corpus is a JSON file of reviews with a 'content' field or a directory of op_spam review folds
+			<object_name> = SemanticMatrix.load(<directory>)
+			<object_name>.P_semantic(<list of words>, <dictionary of term frequencies of a review>)
+			<object_name>.similarity(<word>, <word>)
+'''
+
+'''
+	Dependencies of the class. The different libraries used -
+	1> NUMPY
+	2> SCIPY
+	3> OS
+	4> JSON
+	5> MULTIPROCESSING
+	6> word_similarity, synsets from short_sentence_similarity
+	7> TEXTNORM (textnorm)
+'''
+import numpy as np
+from scipy import sparse
+import os
+import json
+import multiprocessing
+from short_sentence_similarity import word_similarity, synsets
+import textnorm
+
+'''
+	Default directory, cutoff, value type and corpora of the table, and the files of the matrix in its directory.
+'''
+SEMANTIC_MATRIX = 'term_relationships'
+CUTOFF = 0.1
+DTYPE = np.float16
+CORPORA = ('hotelreviewsupdated.json', 'negative_polarity', 'positive_polarity')
+VOCABULARY_FILE = 'vocab.npy'
+DATA_FILE = 'data.npy'
+INDICES_FILE = 'indices.npy'
+INDPTR_FILE = 'indptr.npy'
+RELATIONSHIPS_FILE = 'relationships.npy'
+
+'''
+	State of the processes building the matrix: the vocabulary, the positions of the terms with synsets and the cutoff.
+'''
+_build_vocabulary = None
+_build_candidates = None
+_build_threshold = None
+
+def _init_build_worker(vocabulary, candidates, threshold):
+	global _build_vocabulary, _build_candidates, _build_threshold
+	_build_vocabulary = vocabulary
+	_build_candidates = candidates
+	_build_threshold = threshold
+
+'''
+	Function computing one row of the upper triangle of the matrix.
+	Input: position of the term among the candidates
+	Output: row of the term, columns and values of its associations with the following candidates
+'''
+
+def _build_row(position):
+	i = _build_candidates[position]
+	columns = []
+	values = []
+	for j in _build_candidates[position:]:
+		value = word_similarity(_build_vocabulary[i], _build_vocabulary[j])
+		if value > 0.0 and value >= _build_threshold:
+			columns.append(j)
+			values.append(value)
+	return i, np.array(columns, dtype=np.int32), np.array(values)
+
+class SemanticMatrix:
+
+	'''
+		Constructor. vocabulary is the sorted array of the terms of the matrix, and data, indices and indptr the arrays of the
+		CSR matrix of their associations. The SciPy matrix over them (see csr) is made at its first use and shares the memory
+		mapped arrays. relationships is |R|, counted from the arrays if not given.
+	'''
+
+	def __init__(self, vocabulary, data, indices, indptr, relationships=None):
+		self.vocabulary = vocabulary
+		self.data = data
+		self.indices = indices
+		self.indptr = indptr
+		if relationships is None:
+			rows = np.repeat(np.arange(len(indptr) - 1, dtype=indices.dtype), np.diff(indptr))
+			relationships = (len(data) - np.count_nonzero(indices == rows)) // 2
+		self.relationship_count = int(relationships)
+		self.matrix = None
+
+	'''
+		Function to find the positions of terms in the vocabulary.
+		Input: list of terms
+		Output: list with the row of every term of the vocabulary and None for every other one
+	'''
+
+	def positions(self, words):
+		words = [word.decode('utf-8', 'replace') if isinstance(word, bytes) else word for word in words]
+		if len(words) == 0 or len(self.vocabulary) == 0:
+			return [None] * len(words)
+		words = np.array(words, dtype=np.unicode_)
+		rows = np.minimum(np.searchsorted(self.vocabulary, words), len(self.vocabulary) - 1)
+		found = self.vocabulary[rows] == words
+		return [int(row) if present else None for row, present in zip(rows, found)]
+
+	'''
+		Function to return R as a SciPy CSR matrix, made once over the arrays of the object without copying them.
+	'''
+
+	def csr(self):
+		if self.matrix is None:
+			self.matrix = sparse.csr_matrix((self.data, self.indices, self.indptr),
+				shape=(len(self.vocabulary), len(self.vocabulary)), copy=False)
+		return self.matrix
+
+	'''
+		Function to return |R|, the number of term relationships kept in the matrix: pairs of different terms, each counted once.
+	'''
+
+	def relationships(self):
+		return self.relationship_count
+
+	'''
+		Function to build the matrix over a vocabulary. Terms without WordNet synsets have a similarity of 0 with every term,
+		so only the pairs of terms with synsets are computed, and each pair once. Rows are computed by a pool of worker processes.
+		Input: iterable of terms, cutoff (associations below it are dropped), number of worker processes (None for every core,
+		1 to build in this process), type of the stored values, optional function to report progress
+		Output: SemanticMatrix object
+	'''
+
+	@staticmethod
+	def build(words, threshold=0.0, workers=1, dtype=np.float64, progress=None):
+		vocabulary = np.array(sorted(set(words)), dtype=np.unicode_)
+		candidates = [i for i, word in enumerate(vocabulary) if synsets(word)]
+		if workers == 1:
+			_init_build_worker(vocabulary, candidates, threshold)
+			results = (_build_row(position) for position in range(len(candidates)))
+		else:
+			pool = multiprocessing.Pool(workers, _init_build_worker, (vocabulary, candidates, threshold))
+			results = pool.imap_unordered(_build_row, range(len(candidates)), 16)
+		rows = [np.zeros(0, dtype=np.int32)]
+		columns = [np.zeros(0, dtype=np.int32)]
+		data = [np.zeros(0)]
+		relationships = 0
+		for done, (i, row_columns, values) in enumerate(results):
+			rows.append(np.repeat(np.int32(i), len(row_columns)))
+			columns.append(row_columns)
+			data.append(values)
+			mirror = row_columns != i
+			relationships += int(mirror.sum())
+			rows.append(row_columns[mirror])
+			columns.append(np.repeat(np.int32(i), mirror.sum()))
+			data.append(values[mirror])
+			if progress is not None:
+				progress(done + 1, len(candidates))
+		if workers != 1:
+			pool.close()
+			pool.join()
+		matrix = sparse.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(columns))),
+			shape=(len(vocabulary), len(vocabulary)))
+		matrix.sort_indices()
+		return SemanticMatrix(vocabulary, matrix.data.astype(dtype), matrix.indices, matrix.indptr, relationships)
+
+	'''
+		Function to build the vocabulary of a corpus, as UntruthfulSpam vectorizes its reviews.
+		Input: list of reviews (text)
+		Output: set of terms
+	'''
+
+	@staticmethod
+	def corpus_vocabulary(reviews):
+		vocabulary = set()
+		for words in textnorm.vectorize_batch(reviews, lowercase=True, keep_pronouns=False):
+			vocabulary.update(words)
+		return vocabulary
+
+	'''
+		Function to read the reviews of a corpus: a JSON file of items with a 'content' field, or a directory of op_spam
+		folds (and sub-directories) of review text files.
+		Input: path of the corpus
+		Output: list of reviews
+	'''
+
+	@staticmethod
+	def corpus_reviews(path):
+		if not os.path.isdir(path):
+			with open(path) as jsonfile:
+				return [item['content'] for item in json.load(jsonfile)]
+		reviews = []
+		for root, directories, names in os.walk(path):
+			for name in sorted(names):
+				if name.endswith('.txt'):
+					reviews.append(open(os.path.join(root, name)).read().decode('utf-8', 'replace'))
+		return reviews
+
+	def save(self, directory):
+		if not os.path.isdir(directory):
+			os.makedirs(directory)
+		np.save(os.path.join(directory, VOCABULARY_FILE), self.vocabulary)
+		np.save(os.path.join(directory, DATA_FILE), self.data)
+		np.save(os.path.join(directory, INDICES_FILE), self.indices)
+		np.save(os.path.join(directory, INDPTR_FILE), self.indptr)
+		np.save(os.path.join(directory, RELATIONSHIPS_FILE), np.array(self.relationship_count, dtype=np.int64))
+
+	@staticmethod
+	def load(directory):
+		load = lambda name: np.load(os.path.join(directory, name), mmap_mode='r')
+		relationships = None
+		if os.path.exists(os.path.join(directory, RELATIONSHIPS_FILE)):
+			relationships = load(RELATIONSHIPS_FILE)
+		return SemanticMatrix(load(VOCABULARY_FILE), load(DATA_FILE), load(INDICES_FILE), load(INDPTR_FILE), relationships)
+
+	'''
+		Function to look up the similarity of two terms in the matrix. WordNet lowercases words, so the terms are looked up lowercased.
+		Input: two words
+		Output: their similarity (0.0 if it is below the cutoff), or None if a word is not in the vocabulary
+	'''
+
+	def similarity(self, word_1, word_2):
+		row, column = self.positions([word_1.lower(), word_2.lower()])
+		if row is None or column is None:
+			return None
+		start, end = self.indptr[row], self.indptr[row + 1]
+		indices = self.indices[start:end]
+		k = np.searchsorted(indices, column)
+		if k < len(indices) and indices[k] == column:
+			return float(self.data[start + k])
+		return 0.0
+
+	'''
+		Function to calculate P_semantic of several terms with respect to one review, as one sparse product of their rows of R
+		with the sparse term frequency vector of the review.
+		P_semantic(t1) = sum(association_probability(t1,t2) * (tf(t2,d)/|d|))/|R|
+		Associations with terms outside the vocabulary are not in the matrix, so they are computed live with word_similarity.
+		Input: list of terms, dictionary containing tf(t,d)/|d| of the terms of the review
+		Output: NumPy array of the P_semantic scores of the terms
+	'''
+
+	def P_semantic(self, words, frequencies):
+		unknown = []
+		columns = []
+		values = []
+		items = list(frequencies.items())
+		for (word, frequency), column in zip(items, self.positions([word for word, frequency in items])):
+			if column is None:
+				unknown.append((word, frequency))
+			else:
+				columns.append(column)
+				values.append(frequency)
+		rows = self.positions(words)
+		known = [i for i, row in enumerate(rows) if row is not None]
+		scores = np.zeros(len(words))
+		if known and columns:
+			vector = sparse.csr_matrix((values, (columns, np.zeros(len(columns), dtype=np.int32))), shape=(len(self.vocabulary), 1))
+			product = self.csr()[[rows[i] for i in known]].astype(np.float64).dot(vector)
+			scores[known] = product.toarray().ravel()
+		for i, word in enumerate(words):
+			if rows[i] is None:
+				scores[i] = sum(word_similarity(other, word) * frequency for other, frequency in frequencies.items())
+			else:
+				for other, frequency in unknown:
+					scores[i] += word_similarity(other, word) * frequency
+		return scores / max(self.relationships(), 1)
+
+if __name__ == '__main__':
+	import sys
+	directory = sys.argv[1] if len(sys.argv) > 1 else SEMANTIC_MATRIX
+	threshold = float(sys.argv[2]) if len(sys.argv) > 2 else CUTOFF
+	corpora = sys.argv[3:] or [path for path in CORPORA if os.path.exists(path)]
+	vocabulary = set()
+	for path in corpora:
+		vocabulary.update(SemanticMatrix.corpus_vocabulary(SemanticMatrix.corpus_reviews(path)))
+	def progress(done, total):
+		if done % 100 == 0 or done == total:
+			print "%d/%d terms" % (done, total)
+	semantic = SemanticMatrix.build(vocabulary, threshold, None, DTYPE, progress)
+	semantic.save(directory)
+	print "%d terms, |R| = %d" % (len(semantic.vocabulary), semantic.relationships())
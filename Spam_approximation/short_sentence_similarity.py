@@ -7,12 +7,14 @@ Link to the implementation - https://github.com/sujitpal/nltk-examples/blob/mast
 '''
 
 from __future__ import division
-import nltk
-from nltk.corpus import wordnet as wn
-from nltk.corpus import brown
 import math
 import numpy as np
 import sys
+import atexit
+import os
+from lrucache import LRUCache
+from similaritycache import SimilarityCache
+from brownfreqs import BrownFrequencies, BROWN_TABLE
 
 '''
 	Parameters to the algorithm. Currently set to values that was reported
@@ -25,8 +27,109 @@ ETA = 0.4
 PHI = 0.2
 DELTA = 0.85
 
-brown_freqs = dict()
-N = 0
+brown_freqs = None
+
+'''
+	NLTK is heavy to import, so WordNet and the word tokenizer are imported at their first use.
+'''
+wn = None
+
+def wordnet():
+	global wn
+	if wn is None:
+		from nltk.corpus import wordnet as corpus
+		wn = corpus
+	return wn
+
+def word_tokenize(sentence):
+	import nltk
+	return nltk.word_tokenize(sentence)
+
+#==== WordNet caches ====
+
+'''
+	WordNet lookups are memoized: the synsets of every word, and for every synset its hypernym distance map, maximum depth,
+	lemma names and shortest hypernym paths. WordNet is read-only, so the cached values are the ones the lookups return.
+	Path similarities of synset pairs are memoized per ordered pair in a bounded cache.
+'''
+PATH_SIMILARITY_CACHE_SIZE = 1000000
+_synsets = {}
+_hypernym_maps = {}
+_lemma_names = {}
+_shortest_paths = {}
+_path_similarity_cache = LRUCache(PATH_SIMILARITY_CACHE_SIZE)
+_MISSING = object()
+
+def synsets(word):
+	result = _synsets.get(word)
+	if result is None:
+		result = _synsets[word] = wordnet().synsets(word)
+	return result
+
+def hypernym_map(synset):
+	"""
+    
+    Return the map from every hypernym of the synset (itself included) to
+    its distance, and the maximum of those distances.
+    
+    """
+	entry = _hypernym_maps.get(synset)
+	if entry is None:
+		distances = synset.hypernym_distances()
+		entry = _hypernym_maps[synset] = ({x[0]:x[1] for x in distances}, max([x[1] for x in distances]))
+	return entry
+
+def lemma_names(synset):
+	names = _lemma_names.get(synset)
+	if names is None:
+		names = _lemma_names[synset] = frozenset([str(x.name()) for x in synset.lemmas()])
+	return names
+
+def shortest_paths(synset, simulate_root):
+	key = (synset, simulate_root)
+	paths = _shortest_paths.get(key)
+	if paths is None:
+		paths = _shortest_paths[key] = synset._shortest_hypernym_paths(simulate_root)
+	return paths
+
+def shortest_path_distance(synset_1, synset_2, simulate_root=False):
+	"""
+    
+    Same as Synset.shortest_path_distance, on the cached shortest
+    hypernym paths of both synsets.
+    
+    """
+	if synset_1 == synset_2:
+		return 0
+	paths_1 = shortest_paths(synset_1, simulate_root)
+	paths_2 = shortest_paths(synset_2, simulate_root)
+	inf = float('inf')
+	path_distance = inf
+	for synset, d1 in paths_1.iteritems():
+		path_distance = min(path_distance, d1 + paths_2.get(synset, inf))
+	return None if math.isinf(path_distance) else path_distance
+
+def path_similarity(synset_1, synset_2):
+	"""
+    
+    Same as wn.path_similarity, memoized per ordered pair of synsets.
+    
+    """
+	key = (synset_1, synset_2)
+	sim = _path_similarity_cache.get(key, _MISSING)
+	if sim is _MISSING:
+		distance = shortest_path_distance(synset_1, synset_2, bool(synset_1._needs_root()))
+		sim = None if distance is None or distance < 0 else 1.0 / (distance + 1)
+		_path_similarity_cache.put(key, sim)
+	return sim
+
+def clear_wordnet_caches():
+	_synsets.clear()
+	_hypernym_maps.clear()
+	_lemma_names.clear()
+	_shortest_paths.clear()
+	_path_similarity_cache.clear()
+	_word_bounds.clear()
 
 #==== word similarity ====
 
@@ -38,8 +141,8 @@ def get_best_synset_pair(word_1,word_2):
     
     """
 	max_sim = -1.0
-	synsets_1 = wn.synsets(word_1)
-	synsets_2 = wn.synsets(word_2)
+	synsets_1 = synsets(word_1)
+	synsets_2 = synsets(word_2)
 	if len(synsets_1) == 0 or len(synsets_2) == 0:
 		return None, None
 	else:
@@ -47,7 +150,7 @@ def get_best_synset_pair(word_1,word_2):
 		best_pair = None,None
 		for synset_1 in synsets_1:
 			for synset_2 in synsets_2:
-				sim = wn.path_similarity(synset_1, synset_2)
+				sim = path_similarity(synset_1, synset_2)
 				if sim > max_sim:
 					max_sim = sim
 					best_pair = synset_1, synset_2
@@ -67,12 +170,10 @@ def length_dist(synset_1,synset_2):
 	if synset_1 == synset_2:
 		l_dist = 0.0
 	else:
-		wset_1 = set([str(x.name()) for x in synset_1.lemmas()])
-		wset_2 = set([str(x.name()) for x in synset_2.lemmas()])
-		if len(wset_1.intersection(wset_2)) > 0:
+		if len(lemma_names(synset_1).intersection(lemma_names(synset_2))) > 0:
 			l_dist = 1.0
 		else:
-			l_dist = synset_1.shortest_path_distance(synset_2)
+			l_dist = shortest_path_distance(synset_1, synset_2)
 			if l_dist is None:
 				l_dist = 0.0
 	return math.exp(-ALPHA * l_dist)
@@ -89,50 +190,204 @@ def hierarchy_dist(synset_1, synset_2):
 	if synset_1 is None or synset_2 is None:
 		return h_dist
 	if synset_1 == synset_2:
-		h_dist = max([x[1] for x in synset_1.hypernym_distances()])
+		h_dist = hypernym_map(synset_1)[1]
 	else:
-		hypernyms_1 = {x[0]:x[1] for x in synset_1.hypernym_distances()}
-		hypernyms_2 = {x[0]:x[1] for x in synset_2.hypernym_distances()}
+		hypernyms_1 = hypernym_map(synset_1)[0]
+		hypernyms_2 = hypernym_map(synset_2)[0]
 		lcs_candidates = set(hypernyms_1.keys()).intersection(
 			set(hypernyms_2.keys()))
 		if len(lcs_candidates) > 0:
-			lcs_dists = []
-			for lcs_candidate in lcs_candidates:
-				lcs_d1 = 0
-				if hypernyms_1.has_key(lcs_candidate):
-					lcs_d1 = hypernyms_1[lcs_candidate]
-				lcs_d2 = 0
-				if hypernyms_2.has_key(lcs_candidate):
-					lcs_d2 = hypernyms_2[lcs_candidate]
-				lcs_dists.append(max([lcs_d1, lcs_d2]))
-			h_dist = max(lcs_dists)
+			h_dist = max([max([hypernyms_1[lcs_candidate], hypernyms_2[lcs_candidate]]) for lcs_candidate in lcs_candidates])
 		else:
 			h_dist = 0
 	return ((math.exp(BETA * h_dist) - math.exp(-BETA * h_dist)) / (math.exp(BETA * h_dist) + math.exp(-BETA * h_dist)))
 
-def word_similarity(word_1, word_2):
+def compute_word_similarity(word_1, word_2):
 	synset_pair = get_best_synset_pair(word_1, word_2)
 	return (length_dist(synset_pair[0], synset_pair[1]) * hierarchy_dist(synset_pair[0], synset_pair[1]))
 
+'''
+	Word similarities are read first from the precomputed similarity table of the corpus vocabulary, if use_similarity_table
+	was called (see semantic_matrix.py). Pairs with a word outside the table are memoized per unordered pair of words, first
+	in a bounded in-memory cache and then, if use_similarity_cache was called, in an SQLite file shared across processes and
+	runs. The pair is computed in canonical (sorted) order, so word_similarity(a, b) == word_similarity(b, a).
+'''
+WORD_SIMILARITY_CACHE_SIZE = 500000
+_similarity_cache = LRUCache(WORD_SIMILARITY_CACHE_SIZE)
+_similarity_store = None
+_similarity_table = None
+
+def use_similarity_table(path):
+	global _similarity_table
+	from semantic_matrix import SemanticMatrix
+	_similarity_table = SemanticMatrix.load(path)
+	return _similarity_table
+
+def use_similarity_cache(path):
+	global _similarity_store
+	if _similarity_store is not None:
+		_similarity_store.close()
+	_similarity_store = SimilarityCache(path)
+	atexit.register(_similarity_store.flush)
+	return _similarity_store
+
+def word_similarity(word_1, word_2):
+	if _similarity_table is not None:
+		sim = _similarity_table.similarity(word_1, word_2)
+		if sim is not None:
+			return sim
+	key = (word_1, word_2) if word_1 <= word_2 else (word_2, word_1)
+	sim = _similarity_cache.get(key)
+	if sim is None:
+		if _similarity_store is not None:
+			sim = _similarity_store.get(key)
+		if sim is None:
+			sim = compute_word_similarity(key[0], key[1])
+			if _similarity_store is not None:
+				_similarity_store.put(key, sim)
+		_similarity_cache.put(key, sim)
+	return sim
+
+def word_similarity_stats():
+	"""
+    
+    Return the hit and miss counters of the in-memory and on-disk tiers
+    of the word similarity cache.
+    
+    """
+	return {'memory': _similarity_cache.stats(),
+		'disk': None if _similarity_store is None else _similarity_store.stats()}
+
 # ==== sentence similarity ====
-def most_similar_word(word, word_set):
+
+'''
+	Upper bound of word_similarity, used to prune most_similar_word. The similarity of two words is the one of a pair of their
+	synsets, exp(-ALPHA * l) * tanh(BETA * h), so it is bounded over all the pairs at once with the hypernyms (itself included)
+	of every synset of each word:
+	- h is the largest distance of either synset to a common hypernym. It is at most the largest distance of either word to a
+	  hypernym common to both words, and 0 (so the similarity is 0) when the words have no common hypernym.
+	- l is 0 for a shared synset, 1 for a shared lemma, and otherwise the shortest path between the synsets through a common
+	  hypernym. It is at least the sum of the shortest distances of both words to their nearest common hypernym.
+	When the similarity table holds both words, the bound is the table value itself, which word_similarity returns, so WordNet
+	is only read for words outside the table. BOUND_SLACK covers rounding of the WordNet bound.
+'''
+BOUND_SLACK = 1.0 + 2.0 ** -8
+_word_bounds = {}
+
+def word_bound(word):
+	"""
+    
+    Return the synsets of a word as a set, the deepest hypernym distance
+    over them (None if the word has no synsets), the names of their lemmas,
+    and two maps from every hypernym of the synsets to the largest and to
+    the shortest distance of a synset of the word to it.
+    
+    """
+	bound = _word_bounds.get(word)
+	if bound is None:
+		word_synsets = synsets(word)
+		deepest = {}
+		nearest = {}
+		names = set()
+		for synset in word_synsets:
+			for hypernym, distance in hypernym_map(synset)[0].iteritems():
+				if distance > deepest.get(hypernym, -1):
+					deepest[hypernym] = distance
+			for hypernym, distance in shortest_paths(synset, False).iteritems():
+				if hypernym not in nearest or distance < nearest[hypernym]:
+					nearest[hypernym] = distance
+			names.update(lemma_names(synset))
+		depth = max([hypernym_map(synset)[1] for synset in word_synsets]) if len(word_synsets) > 0 else None
+		bound = _word_bounds[word] = (frozenset(word_synsets), depth, frozenset(names), deepest, nearest)
+	return bound
+
+def similarity_bound(word_1, word_2):
+	if _similarity_table is not None:
+		sim = _similarity_table.similarity(word_1, word_2)
+		if sim is not None:
+			return sim
+	synsets_1, depth_1, names_1, deepest_1, nearest_1 = word_bound(word_1)
+	synsets_2, depth_2, names_2, deepest_2, nearest_2 = word_bound(word_2)
+	if depth_1 is None or depth_2 is None:
+		return 0.0
+	if synsets_1.isdisjoint(synsets_2):
+		if len(deepest_1) > len(deepest_2):
+			deepest_1, deepest_2 = deepest_2, deepest_1
+		common = [hypernym for hypernym in deepest_1 if hypernym in deepest_2]
+		if len(common) == 0:
+			return 0.0
+		h_dist = max([max(deepest_1[hypernym], deepest_2[hypernym]) for hypernym in common])
+		if names_1.isdisjoint(names_2):
+			if len(nearest_1) > len(nearest_2):
+				nearest_1, nearest_2 = nearest_2, nearest_1
+			distances = [distance + nearest_2[hypernym] for hypernym, distance in nearest_1.iteritems() if hypernym in nearest_2]
+			l_dist = max(min(distances), 1) if len(distances) > 0 else 0
+		else:
+			l_dist = 1
+	else:
+		h_dist = max(depth_1, depth_2)
+		l_dist = 0
+	bound = math.exp(-ALPHA * l_dist) * ((math.exp(BETA * h_dist) - math.exp(-BETA * h_dist)) / (math.exp(BETA * h_dist) + math.exp(-BETA * h_dist)))
+	return bound * BOUND_SLACK
+
+def most_similar_word(word, word_set, floor=None, word_sim=None):
 	"""
     
     Find the word in the joint word set that is most similar to the word
     passed in. We use the algorithm above to compute word similarity between
     the word and each word in the joint word set, and return the most similar
     word and the actual similarity value.
+    Candidates are tried from the highest similarity_bound down, and the
+    search stops when no remaining candidate can reach the best similarity.
+    Among equal similarities the first word of word_set wins, so the answer
+    is the one of a full scan. If floor is given, the search also stops when
+    neither the best similarity nor any remaining candidate is above floor;
+    the answer is then only guaranteed to be at or below floor.
+    word_sim replaces word_similarity, e.g. with a memoized version.
     
     """
+	word_sim = word_sim or word_similarity
+	candidates = sorted((-similarity_bound(word, ref_word), index, ref_word) for index, ref_word in enumerate(word_set))
 	max_sim = -1.0
 	sim_word = ""
-	for ref_word in word_set:
-		sim = word_similarity(word, ref_word)
-		if sim > max_sim:
+	best_index = None
+	for negative_bound, index, ref_word in candidates:
+		bound = -negative_bound
+		if bound < max_sim:
+			break
+		if floor is not None and bound <= floor and max_sim <= floor:
+			break
+		sim = word_sim(word, ref_word) if bound > 0.0 else 0.0
+		if sim > max_sim or (sim == max_sim and index < best_index):
 			max_sim = sim
 			sim_word = ref_word
+			best_index = index
 	return sim_word, max_sim
 
+def most_similar_words(words, word_set, floor=None, word_sim=None):
+	"""
+    
+    Same as most_similar_word for every word of a list.
+    
+    """
+	return [most_similar_word(word, word_set, floor, word_sim) for word in words]
+
+def brown_frequencies():
+	"""
+    
+    Return the Brown corpus frequency table. The precomputed table in
+    BROWN_TABLE (built with brownfreqs.py) is memory mapped; without it
+    the table is counted from brown.sents() once per process.
+    
+    """
+	global brown_freqs
+	if brown_freqs is None:
+		if os.path.isdir(BROWN_TABLE):
+			brown_freqs = BrownFrequencies.load(BROWN_TABLE)
+		else:
+			brown_freqs = BrownFrequencies.build()
+	return brown_freqs
+
 def info_content(lookup_word):
 	"""
     
@@ -141,52 +396,68 @@ def info_content(lookup_word):
     to compute the information content of the lookup_word.
     
     """
-	global N
-	if N==0:
-		for sent in brown.sents():
-			for word in sent:
-				word = word.lower()
-				if not brown_freqs.has_key(word):
-					brown_freqs[word] = 0
-				brown_freqs[word] = brown_freqs[word] + 1
-				N = N+1
-	lookup_word = lookup_word.lower()
-	n = 0 if not brown_freqs.has_key(lookup_word) else brown_freqs[lookup_word]
-	return 1.0 - (math.log(n+1) / math.log(N+1))
+	freqs = brown_frequencies()
+	n = freqs.count(lookup_word.lower())
+	return 1.0 - (math.log(n+1) / math.log(freqs.total+1))
 
-def semantic_vector(words, joint_words, info_content_norm):
+def sentence_vectors(words, joint_words, info_content_norm, windex=None, word_sim=None, most_similar=None):
 	"""
-    Computes the semantic vector of a sentence. The sentence is passed in as
-    a collection of words. The size of the semantic vector is the same as the
-    size of the joint word set. The elements are 1 if a word in the sentence
-    already exists in the joint word set, or the similarity of the word to the
-    most similar word in the joint word set if it doesn't. Both values are 
-    further normalized by the word's (and similar word's) information content
-    if info_content_norm is True.
+    Computes the semantic vector and, if windex is given, the word order
+    vector of a sentence (see semantic_vector and word_order_vector). The
+    most similar sentence word of every joint word missing from the sentence
+    is found once and used by both vectors. Both only use it when its
+    similarity is above PHI or ETA, so the search stops below those.
+    most_similar is a dictionary of the matches already found for the
+    sentence; it is filled with the new ones, so a sentence compared with
+    many others searches every word once.
     """
 	sent_set = set(words)
+	if most_similar is None:
+		most_similar = {}
+	missing = [joint_word for joint_word in joint_words if joint_word not in sent_set and joint_word not in most_similar]
+	most_similar.update(zip(missing, most_similar_words(missing, sent_set, min(PHI, ETA), word_sim)))
 	semvec = np.zeros(len(joint_words))
+	wovec = np.zeros(len(joint_words)) if windex is not None else None
 	i = 0
 	for joint_word in joint_words:
 		if joint_word in sent_set:
 			semvec[i] = 1.0
 			if info_content_norm:
 				semvec[i] = semvec[i] * math.pow(info_content(joint_word), 2)
+			if windex is not None:
+				wovec[i] = windex[joint_word]
 		else:
-			sim_word, max_sim = most_similar_word(joint_word, sent_set)
+			sim_word, max_sim = most_similar[joint_word]
 			semvec[i] = PHI if max_sim > PHI else 0.0
 			if info_content_norm:
 				semvec[i] = semvec[i] * info_content(joint_word) * info_content(sim_word)
+			if windex is not None:
+				if max_sim > ETA:
+					wovec[i] = windex[sim_word]
+				else:
+					wovec[i] = 0
 		i = i + 1
-	return semvec
+	return semvec, wovec
+
+def semantic_vector(words, joint_words, info_content_norm):
+	"""
+    Computes the semantic vector of a sentence. The sentence is passed in as
+    a collection of words. The size of the semantic vector is the same as the
+    size of the joint word set. The elements are 1 if a word in the sentence
+    already exists in the joint word set, or the similarity of the word to the
+    most similar word in the joint word set if it doesn't. Both values are 
+    further normalized by the word's (and similar word's) information content
+    if info_content_norm is True.
+    """
+	return sentence_vectors(words, list(joint_words), info_content_norm)[0]
 	
 def semantic_similarity(sentence_1, sentence_2, info_content_norm):
 	"""
     Computes the semantic similarity between two sentences as the cosine
     similarity between the semantic vectors computed for each sentence.
     """
-	words_1 = nltk.word_tokenize(sentence_1)
-	words_2 = nltk.word_tokenize(sentence_2)
+	words_1 = word_tokenize(sentence_1)
+	words_2 = word_tokenize(sentence_2)
 	joint_words = set(words_1).union(set(words_2))
 	vec_1 = semantic_vector(words_1, joint_words, info_content_norm)
 	vec_2 = semantic_vector(words_2, joint_words, info_content_norm)
@@ -205,29 +476,17 @@ def word_order_vector(words, joint_words, windex):
     position of the most similar word in the sentence as long as the similarity
     is above the threshold ETA.
     """
-	wovec = np.zeros(len(joint_words))
-	i = 0
-	wordset = set(words)
-	for joint_word in joint_words:
-		if joint_word in wordset:
-			wovec[i] = windex[joint_word]
-		else:
-			sim_word, max_sim = most_similar_word(joint_word, wordset)
-			if max_sim > ETA:
-				wovec[i] = windex[sim_word]
-			else:
-				wovec[i] = 0
-		i = i + 1
-	return wovec
+	return sentence_vectors(words, joint_words, False, windex)[1]
 	
 def word_order_similarity(sentence_1, sentence_2):
 	"""
     Computes the word-order similarity between two sentences as the normalized
-    difference of word order between the two sentences.
+    difference of word order between the two sentences. The joint words are
+    taken in sorted order, as in tokens_similarity.
     """
-	words_1 = nltk.word_tokenize(sentence_1)
-	words_2 = nltk.word_tokenize(sentence_2)		
-	joint_words = list(set(words_1).union(set(words_2)))
+	words_1 = word_tokenize(sentence_1)
+	words_2 = word_tokenize(sentence_2)		
+	joint_words = sorted(set(words_1).union(set(words_2)))
 	windex = {x[1]: x[0] for x in enumerate(joint_words)}
 	r1 = word_order_vector(words_1, joint_words, windex)
 	r2 = word_order_vector(words_2, joint_words, windex)
@@ -239,9 +498,68 @@ def similarity(sentence_1, sentence_2, info_content_norm):
 	"""
     Calculate the semantic similarity between two sentences. The last 
     parameter is True or False depending on whether information content
-    normalization is desired or not.
+    normalization is desired or not. Both sentences are tokenized once and
+    their semantic and word order vectors are computed together.
+    """
+	return tokens_similarity(word_tokenize(sentence_1), word_tokenize(sentence_2), info_content_norm)
+
+def tokens_similarity(words_1, words_2, info_content_norm, word_sim=None):
+	"""
+    Same as similarity, for two already tokenized sentences. The joint
+    words are taken in sorted order, so the word order vectors, and the
+    similarity, do not depend on the order of a Python set.
+    """
+	return joint_similarity(words_1, words_2, sorted(set(words_1).union(set(words_2))), info_content_norm, word_sim)
+
+def joint_similarity(words_1, words_2, joint_words, info_content_norm, word_sim=None, most_similar=(None, None)):
+	"""
+    Same as tokens_similarity, with the list of joint words of the two
+    sentences given, and optionally the dictionaries of the matches already
+    found for each sentence (see sentence_vectors).
+    """
+	windex = {x[1]: x[0] for x in enumerate(joint_words)}
+	vec_1, r1 = sentence_vectors(words_1, joint_words, info_content_norm, windex, word_sim, most_similar[0])
+	vec_2, r2 = sentence_vectors(words_2, joint_words, info_content_norm, windex, word_sim, most_similar[1])
+	semantic = np.dot(vec_1, vec_2.T) / (np.linalg.norm(vec_1) * np.linalg.norm(vec_2))
+	word_order = 1.0 - (np.linalg.norm(r1 - r2) / np.linalg.norm(r1 + r2))
+	return DELTA * semantic + (1.0 - DELTA) * word_order
+
+def similarity_matrix(sentences, info_content_norm=False, threshold=None):
+	"""
+    Calculate the similarity between every pair of sentences, as
+    tokens_similarity of their tokens, in a symmetric float32 matrix with
+    1.0 on the diagonal. Every sentence is tokenized once, one sorted
+    vocabulary of all the sentences gives the joint words of every pair,
+    the similarity of every distinct pair of words is computed once, and
+    the most similar word of a sentence to a vocabulary word is searched
+    once per sentence.
+    If threshold is given, the comparisons of a sentence with the sentences
+    after it stop at the first one at least that similar (e.g. its
+    template), and the similarities left uncomputed are NaN.
     """
-	return DELTA * semantic_similarity(sentence_1, sentence_2, info_content_norm) + (1.0 - DELTA) * word_order_similarity(sentence_1,sentence_2)
+	tokens = [word_tokenize(sentence) for sentence in sentences]
+	vocabulary = sorted(set(word for words in tokens for word in words))
+	vocabulary_index = dict((word, k) for k, word in enumerate(vocabulary))
+	word_ids = [np.unique([vocabulary_index[word] for word in words]).astype(np.int64) for words in tokens]
+	matches = [{} for words in tokens]
+	pair_sims = {}
+	def word_sim(word_1, word_2):
+		key = (word_1, word_2) if word_1 <= word_2 else (word_2, word_1)
+		sim = pair_sims.get(key)
+		if sim is None:
+			sim = pair_sims[key] = word_similarity(key[0], key[1])
+		return sim
+	n = len(tokens)
+	matrix = np.full((n, n), np.nan, dtype=np.float32)
+	for i in range(n):
+		matrix[i, i] = 1.0
+		for j in range(i + 1, n):
+			joint_words = [vocabulary[k] for k in np.union1d(word_ids[i], word_ids[j])]
+			matrix[i, j] = matrix[j, i] = joint_similarity(tokens[i], tokens[j], joint_words, info_content_norm, word_sim,
+				(matches[i], matches[j]))
+			if threshold is not None and matrix[i, j] >= threshold:
+				break
+	return matrix
 '''
 	Few test cases
 '''
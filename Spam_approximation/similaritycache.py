@@ -0,0 +1,78 @@
+'''
+	Script containing the on-disk cache of word similarities used by short_sentence_similarity.
+	Similarities are stored in an SQLite file keyed by the pair of words in canonical order, so every process and every run
+	over the same vocabulary reuses them. New similarities are written in batches of COMMIT_EVERY, and on flush or close.
+	Syntax-
+			<object_name> = SimilarityCache(<path>)
+			short_sentence_similarity.use_similarity_cache(<path>)
+'''
+
+'''
+	Dependencies of the class. The different libraries used -
+	1> SQLITE3
+'''
+import sqlite3
+
+'''
+	Number of new similarities held in memory before they are committed to the file.
+'''
+COMMIT_EVERY = 1000
+
+class SimilarityCache:
+
+	'''
+		Constructor to open (or create) the cache file.
+		Input: path of the SQLite file
+	'''
+
+	def __init__(self, path):
+		self.path = path
+		self.hits = 0
+		self.misses = 0
+		self.pending = []
+		self.connection = sqlite3.connect(path, timeout=60)
+		self.connection.execute('CREATE TABLE IF NOT EXISTS similarities (word_1 TEXT, word_2 TEXT, value REAL, PRIMARY KEY (word_1, word_2))')
+		self.connection.commit()
+
+	'''
+		Function to look up the similarity of a pair of words.
+		Input: pair of words in canonical order
+		Output: similarity, or None if the pair is not cached
+	'''
+
+	def get(self, key):
+		row = self.connection.execute('SELECT value FROM similarities WHERE word_1 = ? AND word_2 = ?', key).fetchone()
+		if row is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		return row[0]
+
+	def put(self, key, value):
+		self.pending.append((key[0], key[1], value))
+		if len(self.pending) >= COMMIT_EVERY:
+			self.flush()
+
+	'''
+		Function to write the pending similarities to the file.
+	'''
+
+	def flush(self):
+		if self.pending:
+			self.connection.executemany('INSERT OR REPLACE INTO similarities (word_1, word_2, value) VALUES (?, ?, ?)', self.pending)
+			self.connection.commit()
+			self.pending = []
+
+	'''
+		Function to return the hit and miss counters of the cache.
+		Input: none
+		Output: dictionary with hits, misses and the number of cached similarities
+	'''
+
+	def stats(self):
+		entries = self.connection.execute('SELECT COUNT(*) FROM similarities').fetchone()[0]
+		return {'hits': self.hits, 'misses': self.misses, 'entries': entries + len(self.pending)}
+
+	def close(self):
+		self.flush()
+		self.connection.close()
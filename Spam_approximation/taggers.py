@@ -0,0 +1,101 @@
+'''
+	Script containing the POS tagger backends used by FeatureClass.
+	Every backend tags a list of tokens (tag) or a list of token lists (tag_sents) and returns (token, tag) tuples with Penn Treebank tags.
+	Backends available -
+			perceptron		NLTK's averaged perceptron tagger, the one nltk.pos_tag uses. Most accurate, slowest.
+			lookup[:<path>]	Lookup table giving each word its most frequent tag, with a fallback tag for unknown words.
+							Several times faster. The table is built from the op_spam corpus by benchmark_taggers.py.
+	Syntax-
+			<FeatureClass object> = FeatureClass(tagger='lookup:tag_table.json')
+'''
+
+'''
+	Dependencies of the class. The different libraries used -
+	1> NLTK (imported when the perceptron backend is built)
+	2> JSON
+	3> COLLECTIONS
+'''
+import json
+from collections import Counter, defaultdict
+
+'''
+	Default backend, and default file of the lookup table.
+'''
+DEFAULT_TAGGER = 'perceptron'
+LOOKUP_TABLE = 'tag_table.json'
+
+'''
+	Backend wrapping NLTK's averaged perceptron tagger. The model is loaded once, when the backend is built.
+'''
+class PerceptronBackend:
+
+	def __init__(self):
+		from nltk.tag import PerceptronTagger
+		self.tagger = PerceptronTagger()
+
+	def tag(self, tokens):
+		return self.tagger.tag(tokens)
+
+	def tag_sents(self, sentences):
+		return [self.tagger.tag(tokens) for tokens in sentences]
+
+'''
+	Backend tagging every token with its most frequent tag in a training corpus, ignoring context.
+	Tokens missing from the table are looked up lowercased, and then get the fallback tag (NN, the most frequent tag of unknown words).
+'''
+class LookupBackend:
+
+	def __init__(self, table, fallback='NN'):
+		self.table = table
+		self.fallback = fallback
+
+	def tag(self, tokens):
+		table = self.table
+		fallback = self.fallback
+		return [(token, table.get(token) or table.get(token.lower(), fallback)) for token in tokens]
+
+	def tag_sents(self, sentences):
+		return [self.tag(tokens) for tokens in sentences]
+
+	'''
+		Function to build a lookup table from tagged token lists, e.g. the token lists of a corpus tagged with the perceptron backend.
+		Input: list of lists of (token, tag) tuples
+		Output: dictionary from token to its most frequent tag
+	'''
+
+	@staticmethod
+	def build_table(tagged_sentences):
+		counts = defaultdict(Counter)
+		for tagged in tagged_sentences:
+			for token, tag in tagged:
+				counts[token][tag] += 1
+				counts[token.lower()][tag] += 1
+		return dict((token, tag_counts.most_common(1)[0][0]) for token, tag_counts in counts.items())
+
+	def save(self, path):
+		with open(path, 'w') as table_file:
+			json.dump({'fallback': self.fallback, 'table': self.table}, table_file)
+
+	@staticmethod
+	def load(path):
+		with open(path) as table_file:
+			saved = json.load(table_file)
+		return LookupBackend(saved['table'], saved['fallback'])
+
+'''
+	Backends are built once per process and shared, like the other resources of FeatureClass.
+	Input: backend name, optionally followed by ':' and an argument (the table file for lookup)
+	Output: the backend
+'''
+_backends = {}
+
+def get_tagger(name=DEFAULT_TAGGER):
+	if name not in _backends:
+		kind, _, argument = name.partition(':')
+		if kind == 'perceptron':
+			_backends[name] = PerceptronBackend()
+		elif kind == 'lookup':
+			_backends[name] = LookupBackend.load(argument or LOOKUP_TABLE)
+		else:
+			raise ValueError('Unknown tagger backend: %s' % name)
+	return _backends[name]
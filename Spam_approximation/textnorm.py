@@ -0,0 +1,79 @@
+'''
+	Script containing the text normalization shared by FeatureClass (featureclass.py) and UntruthfulSpam (untruthfulspam.py).
+	A review is vectorized by removing punctuation, splitting on whitespace and removing common words (NLTK Stopwords).
+	The punctuation tables are built once at import and the stopword sets once per process, at their first use.
+	Syntax-
+			vectorize(<text>)											FeatureClass: case kept, pronouns kept
+			vectorize(<text>, lowercase=True, keep_pronouns=False)		UntruthfulSpam
+'''
+
+'''
+	Dependencies. The different libraries used -
+	1> NLTK (imported at the first use of the stopwords)
+'''
+
+'''
+	Punctuation removed from the reviews, as str.translate tables.
+'''
+PUNCTUATION = ',.?";:-!@#$%^&*()'
+_UNICODE_TABLE = dict((ord(character), None) for character in PUNCTUATION)
+
+'''
+	Pronouns kept by FeatureClass although they are stopwords, since its features count them.
+'''
+PRONOUNS = frozenset(['him','his','herself','she','hers','her','himself','he','me','myself','my'])
+
+_stopwords = None
+_stopwords_without_pronouns = None
+
+'''
+	Function to return the frozen set of NLTK's english stopwords, loaded from the corpus once.
+	Input: whether the pronouns in PRONOUNS are kept out of the set
+	Output: frozenset of stopwords
+'''
+
+def stopword_set(keep_pronouns=False):
+	global _stopwords, _stopwords_without_pronouns
+	if _stopwords is None:
+		from nltk.corpus import stopwords
+		_stopwords = frozenset(stopwords.words('english'))
+		_stopwords_without_pronouns = _stopwords - PRONOUNS
+	return _stopwords_without_pronouns if keep_pronouns else _stopwords
+
+'''
+	Function to remove punctuation from text, with str.translate.
+	Input: text (str or unicode)
+	Output: text without the characters in PUNCTUATION
+'''
+
+def remove_punctuation(text):
+	if isinstance(text, bytes):
+		return text.translate(None, PUNCTUATION)
+	return text.translate(_UNICODE_TABLE)
+
+'''
+	Function to vectorize a text.
+	Input: a review (text), whether it is lowercased first, whether pronouns are kept
+	Output: a list of words in text. Removes punctuation and common words according to NLTK Stopwords.
+'''
+
+def vectorize(text, lowercase=False, keep_pronouns=True):
+	common_words = stopword_set(keep_pronouns)
+	if lowercase:
+		text = text.lower()
+	return [word for word in remove_punctuation(text).split() if word not in common_words]
+
+'''
+	Function to vectorize many texts at once, with the same options as vectorize.
+	Input: list of reviews
+	Output: list of word lists, in the same order
+'''
+
+def vectorize_batch(texts, lowercase=False, keep_pronouns=True):
+	common_words = stopword_set(keep_pronouns)
+	words_lists = []
+	for text in texts:
+		if lowercase:
+			text = text.lower()
+		words_lists.append([word for word in remove_punctuation(text).split() if word not in common_words])
+	return words_lists
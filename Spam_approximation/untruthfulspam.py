@@ -8,22 +8,31 @@
 '''
 	Dependencies of the class. The different libraries used - 
 	1) JSON
-	2) RE (Regular Expressions)
+	2) TEXTNORM (textnorm)
 	3) NLTK
 	4) MATH
-	5) similarity, word_similarity functions from short_sentence_similarity
+	5) similarity, word_similarity and the word similarity cache functions from short_sentence_similarity
+	6) SemanticMatrix (semantic_matrix)
+	7) LRUCache (lrucache)
+	8) HASHLIB
+	9) MinHashLSH (lsh)
+	10) CSV
+	11) PANDAS (imported by the script only)
 	
 '''
 import json
 from short_sentence_similarity import word_similarity
 from short_sentence_similarity import similarity
-from featureclass import FeatureClass
+from short_sentence_similarity import use_similarity_cache, use_similarity_table, word_similarity_stats
 from collections import defaultdict
-import re
-from nltk.corpus import stopwords
+import textnorm
+from semantic_matrix import SemanticMatrix, SEMANTIC_MATRIX
+from lrucache import LRUCache
+from lsh import MinHashLSH
+import hashlib
+import csv
 import math
 import os
-import pandas as pd
 import numpy as np
 '''
 	Values of the Jelinek-Mercer smoothing parameters.
@@ -31,6 +40,33 @@ import numpy as np
 '''
 MU = 0.4
 NU = 0.8
+'''
+	Word similarities computed live are cached on disk, so later runs over the same vocabulary skip WordNet.
+'''
+SIMILARITY_CACHE = 'similarities.sqlite'
+'''
+	Number of review language models, and of probabilities of terms wrt reviews they do not occur in, kept in memory by
+	every UntruthfulSpam object.
+'''
+REVIEW_MODEL_CACHE_SIZE = 10000
+TERM_PROBABILITY_CACHE_SIZE = 1000000
+'''
+	Edge list of the similar review pairs written by the script.
+'''
+SIMILAR_REVIEWS = 'similar_reviews.csv'
+'''
+	Language model of one review: its cache key, its terms, its tf(t,d)/|d| frequencies and the probabilities P(t|d) of its terms.
+	P(t|d) of a term does not depend on the other terms. Probabilities of the terms of other reviews are kept apart, in a bounded
+	cache (see UntruthfulSpam.model_P), so a model never grows past the size of its review.
+'''
+class ReviewModel:
+	
+	def __init__(self,key,tokens,frequencies):
+		self.key = key
+		self.tokens = tokens
+		self.frequencies = frequencies
+		self.probabilities = {}
+	
 '''
 	Class for assigning divergence score to a pair of reviews.
 '''
@@ -44,12 +80,18 @@ class UntruthfulSpam:
 	json_text = []
 	
 	'''
-		Constructor to initialise grand_total and json_text
+		Constructor to initialise grand_total and json_text, and to load R from semantic_path if given. An already loaded R
+		(e.g. the one returned by use_similarity_table) can be passed as semantic instead.
 	'''
 	
-	def __init__(self,jsonfile):
+	def __init__(self,jsonfile,semantic_path=None,semantic=None):
 		self.json_text = json.load(jsonfile)
 		self.grand_total = self.total_frequencies()
+		self.semantic = semantic
+		if semantic_path is not None:
+			self.semantic = SemanticMatrix.load(semantic_path)
+		self.models = LRUCache(REVIEW_MODEL_CACHE_SIZE)
+		self.term_probabilities = LRUCache(TERM_PROBABILITY_CACHE_SIZE)
 	
 	'''
 		Function to return json_text should the reviewer require it.
@@ -65,31 +107,7 @@ class UntruthfulSpam:
 	'''
 	
 	def vectorize_text(self,text):
-		'''
-			Function to remove punctuation from text. Uses regular expressions to remove the same.
-		'''
-	
-		def remove_punctuation(text):
-			return re.sub('[,.?";:\-!@#$%^&*()]', '', text)
-	
-		'''
-			Function to remove common words (i.e. Stopwords) from a text. Primarily done to reduce size of corpus and so that the prediction is not skewed due to presence of a lot of common words.
-		'''
-	
-		def remove_common_words(text_vector):
-			common_words = set(stopwords.words('english'))
-			common_words = common_words
-			#print common_words
-			return [word for word in text_vector if word not in common_words]
-			
-		text = text.lower()
-		#print text
-		text = remove_punctuation(text)
-			#print text
-		words_list = text.split()
-		words_list = remove_common_words(words_list)
-			#print words_list
-		return words_list
+		return textnorm.vectorize(text, lowercase=True, keep_pronouns=False)
 	
 	'''
 		Function to calculate the tf(t,d)/|d| score of each term in the document d. tf(t,d) is the term frequency of term t in the document d and |d| is the length of the document (in words)
@@ -126,13 +144,16 @@ class UntruthfulSpam:
 	'''
 		Calculates the semantic language model probability P_semantic. 
 		P_semantic(t1) = sum(association_probability(t1,t2) * (tf(t2,d)/|d|))/|R|
-		|R| has been approximated to be 5000 here. R represents the set of term relationships between all the words in the corpus. 
-		The approximation is taken as it is computationally expensive.
+		R represents the set of term relationships between all the words in the corpus. With the precomputed matrix R (semantic_matrix.py)
+		the sum is a sparse matrix-vector product and |R| is its number of relationships. Without it the sum is computed live and
+		|R| is approximated to be 2060, as computing it is expensive.
 		Input: word and the word vector of the text.
 		Output: The Semantic Score of the term wrt the document.
 	'''
 	
 	def P_semantic(self,word,review_1):
+		if self.semantic is not None:
+			return self.semantic.P_semantic([word], review_1)[0]
 		#words = word_frequencies(review_1)
 		P_semantic = 0
 		for words in review_1.keys():
@@ -156,142 +177,218 @@ class UntruthfulSpam:
 		probability = (1-MU)*(((1-NU)*words.get(word,0.0)) + (NU * self.P_semantic(word,words))) + (MU * self.grand_total.get(word,0.0))
 		
 		return probability
-			
+	
+	'''
+		Function for the language model of many terms wrt a document at once. Same formula as P, with the tf(t,d)/|d| frequencies
+		of the document already computed and P_semantic of all the terms computed together (one sparse product with R).
+		Input: list of words and dictionary containing tf(t,d)/|d| of the terms of the document
+		Output: NumPy array of the probabilities of the words wrt the document
+	'''
+	
+	def P_frequencies(self,words,frequencies):
+		term_frequencies = np.array([frequencies.get(word,0.0) for word in words])
+		background = np.array([self.grand_total.get(word,0.0) for word in words])
+		if self.semantic is not None:
+			semantic = self.semantic.P_semantic(words, frequencies)
+		else:
+			semantic = np.array([self.P_semantic(word,frequencies) for word in words])
+		return (1-MU)*(((1-NU)*term_frequencies) + (NU*semantic)) + (MU*background)
+	
+	'''
+		Function to return the language model of a review from the model cache, building it on a miss. Reviews are keyed by
+		the given key (e.g. a review id) or by the SHA-1 of their content. The probabilities of the terms of the review are
+		computed when the model is built.
+		Input: a review (text), optional key
+		Output: ReviewModel object
+	'''
+	
+	def review_model(self,review,key=None):
+		if key is None:
+			key = hashlib.sha1(review.encode('utf-8') if isinstance(review, unicode) else review).hexdigest()
+		model = self.models.get(key)
+		if model is None:
+			tokens = self.vectorize_text(review)
+			model = ReviewModel(key, tokens, self.word_frequencies(tokens))
+			terms = list(model.frequencies)
+			model.probabilities = dict(zip(terms, self.P_frequencies(terms, model.frequencies).tolist()))
+			self.models.put(key, model)
+		return model
+	
+	'''
+		Function to return the probabilities of terms wrt a review model. Terms of the review are read from the model, other terms
+		from the bounded term probability cache, keyed by the key of the model and the term. Only the terms found in neither are computed.
+		Input: ReviewModel object and list of words
+		Output: NumPy array of the probabilities of the words wrt the review
+	'''
+	
+	def model_P(self,model,words):
+		probabilities = {}
+		missing = []
+		for word in set(words):
+			probability = model.probabilities.get(word)
+			if probability is None:
+				probability = self.term_probabilities.get((model.key, word))
+			if probability is None:
+				missing.append(word)
+			else:
+				probabilities[word] = probability
+		if len(missing) > 0:
+			for word, probability in zip(missing, self.P_frequencies(missing, model.frequencies).tolist()):
+				probabilities[word] = probability
+				self.term_probabilities.put((model.key, word), probability)
+		return np.array([probabilities[word] for word in words])
 	
 	'''
 		Function to calculate the divergence between the two reviews in question.
 		Score = sum(P(word,review_1) * log(P(word,review_1)/P(word,review_2))
 		PS - review_1 here is the longer review
-		Input: 2 reviews review_1 and review_2
+		The probabilities of both reviews over the joint vocabulary come from their cached language models, so a review compared
+		with many others is vectorized and modelled once. Terms whose logarithm is undefined (a zero probability, or a ratio that
+		underflows to zero) add nothing to the score.
+		Input: 2 reviews review_1 and review_2, optional keys of the reviews (see review_model)
 		Output: The divergence score between the two
 	'''
 	
-	def score(self,review_1,review_2):
-		#review_1 = self.json_text[0]['content']
-		#review_2 = self.json_text[0]['content']
-		review_1 = self.vectorize_text(review_1)
-		review_2 = self.vectorize_text(review_2)
-		all_words = list(set(review_1).union(set(review_2)))
-		score = 0.0
-		for word in all_words:
-			try:
-				if len(review_1) >= len(review_2):
-					score += -(self.P(word,review_1) * math.log(self.P(word,review_1)/self.P(word,review_2),2))
-				else:
-					score += -(self.P(word,review_2) * math.log(self.P(word,review_2)/self.P(word,review_1),2))
-			except Exception:
-				score += 0
-		return score
+	def score(self,review_1,review_2,key_1=None,key_2=None):
+		model_1 = self.review_model(review_1, key_1)
+		model_2 = self.review_model(review_2, key_2)
+		all_words = list(set(model_1.tokens).union(set(model_2.tokens)))
+		if len(model_1.tokens) < len(model_2.tokens):
+			model_1, model_2 = model_2, model_1
+		P_1 = self.model_P(model_1, all_words)
+		P_2 = self.model_P(model_2, all_words)
+		defined = (P_1 > 0) & (P_2 > 0)
+		ratio = P_1[defined] / P_2[defined]
+		terms = -(P_1[defined][ratio > 0] * (np.log(ratio[ratio > 0]) / math.log(2)))
+		# summed in the order of the joint vocabulary, as the terms were added one by one
+		return sum(terms.tolist(), 0.0)
+	
+	'''
+		Function to score the pairs of similar reviews of a collection without scoring all N^2 pairs. Candidate pairs are
+		found with MinHash LSH over the vectorized reviews (lsh.py), and only those get the divergence score. Candidate pairs
+		are streamed bucket by bucket, so the language models of the reviews of a bucket stay in the model cache while they
+		are compared with each other, and no list of the pairs is kept.
+		Input: list of reviews, optional ids of the reviews (their positions by default), MinHashLSH object, minimum estimated
+		Jaccard similarity of the pairs to score
+		Output: generator of (id_1, id_2, estimated Jaccard similarity, divergence score) tuples, one per pair
+	'''
 	
+	def similar_pairs(self,reviews,ids=None,lsh=None,min_jaccard=0.0):
+		if ids is None:
+			ids = range(len(reviews))
+		if lsh is None:
+			lsh = MinHashLSH()
+		signatures, valid = lsh.signatures(textnorm.vectorize_batch(reviews, lowercase=True, keep_pronouns=False))
+		for i, j in lsh.candidate_pairs(signatures, valid):
+			jaccard = lsh.jaccard(signatures[i], signatures[j])
+			if jaccard >= min_jaccard:
+				yield ids[i], ids[j], jaccard, self.score(reviews[i], reviews[j])
 	
 '''
-	opening the file for calculating divergence.
+	Function to write scored review pairs as a sparse edge list, one CSV row per pair.
+	Input: path of the CSV file, iterable of (id_1, id_2, jaccard, score) tuples (see UntruthfulSpam.similar_pairs)
+	Output: number of pairs written
 '''
 
-jsonfile = open('hotelreviewsupdated.json')
-untruthful = UntruthfulSpam(jsonfile)
-json_text = untruthful.json_file()
-
-'''
-	divergence scores between consecutive pairs of documents.
-'''
-'''
-scores = []
-for i in xrange(20):
-	print i
-	scores.append(untruthful.score(json_text[i]['content'], json_text[i+1]['content']))
-print scores
-'''
+def write_edge_list(path,edges):
+	count = 0
+	with open(path, 'wb') as csvfile:
+		writer = csv.writer(csvfile)
+		writer.writerow(['review_1', 'review_2', 'jaccard', 'score'])
+		for id_1, id_2, jaccard, score in edges:
+			writer.writerow([id_1, id_2, jaccard, score])
+			count += 1
+	return count
+	
+	
+if __name__ == '__main__':
+	import pandas as pd
 
+	'''
+		opening the file for calculating divergence.
+	'''
 
-'''
-	Testing on the yelp dataset
-'''
-negative_list = os.listdir("negative_polarity")
-positive_list = os.listdir("positive_polarity")
-def preprocess(files_list,root_dir,polarity):
-	labeled_class = []
-	reviews = []
-	actual_class = []
-	for j in files_list:
-		labeled_class.append(polarity)
-		k = str(open(root_dir + '/' + j).read())
-		reviews.append(k)
-		actual_class.append(str(j.split('_')[0]))
-	data = pd.DataFrame({'labeled_class':labeled_class,'review':reviews,'actual_class':actual_class})
-	return data
+	'''
+		The precomputed term relationship matrix R (built with semantic_matrix.py) is also the word similarity table. Without it
+		P_semantic and the word similarities are computed live. It is loaded once and shared by both.
+	'''
+	use_similarity_cache(SIMILARITY_CACHE)
+	semantic = use_similarity_table(SEMANTIC_MATRIX) if os.path.isdir(SEMANTIC_MATRIX) else None
+	jsonfile = open('hotelreviewsupdated.json')
+	untruthful = UntruthfulSpam(jsonfile, semantic=semantic)
+	json_text = untruthful.json_file()
 
-negative_df = preprocess(negative_list, 'negative_polarity','negative')
-positive_df = preprocess(positive_list, 'positive_polarity','positive')
+	'''
+		divergence scores between consecutive pairs of documents.
+	'''
+	'''
+	scores = []
+	for i in xrange(20):
+		print i
+		scores.append(untruthful.score(json_text[i]['content'], json_text[i+1]['content']))
+	print scores
+	'''
 
-'''
-	Labeling the training data. Labelled 1 if they are true reviews and -1 if they are spam.
-	For example, if the labeled class was positive and actual class is d(i.e. deceptive) it is a fake review.
-'''
-target = []
-for i in positive_df.index:
-	if ((positive_df['labeled_class'][i] == 'positive') & (positive_df['actual_class'][i] == 't')):
-		target.append(1)
-	elif ((positive_df['labeled_class'][i] == 'positive') & (positive_df['actual_class'][i] == 'd')):
-		target.append(-1)
-	else:
-		print 'Error'
-positive_df['target'] = target
 
-'''
-	The loop below is testing the untruthfulspam class on the examples that are definitely spam. Similar loop can be applied to the negative one 
-	as well or to the whole data.
-'''
-iterations = 0
-file1 = open("testfile.txt","w")
-g = list()
-for index, row in positive_df.iterrows():
-	for index1, row2 in positive_df.iterrows():
-		#if index != index1:
-		if iterations <= 10:
-			if row['target'] == -1 and row2['target'] == -1:
-				#temp = []
-				#print type(np.asscalar(index)), index1
-				#temp.append(np.asscalar(index))
-				#temp.append(np.asscalar(index1))
-				score = untruthful.score(row['review'],row2['review'])
-				print score
-				#temp.append(score)
-				file1.write("'{0}','{1}','{2}'".format( np.asscalar(index),np.asscalar(index1),score))
-				iterations += 1
-		else:
-			break
-'''
-	A random test case
-'''	
-review1 = "I love this product"
-review2 = "I like this product"
-print untruthful.score(review1,review2)
+	'''
+		Testing on the yelp dataset
+	'''
+	negative_list = os.listdir("negative_polarity")
+	positive_list = os.listdir("positive_polarity")
+	def preprocess(files_list,root_dir,polarity):
+		labeled_class = []
+		reviews = []
+		actual_class = []
+		for j in files_list:
+			labeled_class.append(polarity)
+			k = str(open(root_dir + '/' + j).read())
+			reviews.append(k)
+			actual_class.append(str(j.split('_')[0]))
+		data = pd.DataFrame({'labeled_class':labeled_class,'review':reviews,'actual_class':actual_class})
+		return data
 
+	negative_df = preprocess(negative_list, 'negative_polarity','negative')
+	positive_df = preprocess(positive_list, 'positive_polarity','positive')
 
-target = []
-for i in negative_df.index:
-	if ((negative_df['labeled_class'][i] == 'negative') & (negative_df['actual_class'][i] == 't')):
-		target.append(1)
-	elif ((negative_df['labeled_class'][i] == 'negative') & (negative_df['actual_class'][i] == 'd')):
-		target.append(-1)
-	else:
-		print "Error"
-negative_df['target'] = target
+	'''
+		Labeling the training data. Labelled 1 if they are true reviews and -1 if they are spam.
+		For example, if the labeled class was positive and actual class is d(i.e. deceptive) it is a fake review.
+	'''
+	target = []
+	for i in positive_df.index:
+		if ((positive_df['labeled_class'][i] == 'positive') & (positive_df['actual_class'][i] == 't')):
+			target.append(1)
+		elif ((positive_df['labeled_class'][i] == 'positive') & (positive_df['actual_class'][i] == 'd')):
+			target.append(-1)
+		else:
+			print 'Error'
+	positive_df['target'] = target
 
-data = positive_df.merge(negative_df,how='outer')
-data = data[['review','target']]
+	'''
+		Testing the untruthfulspam class on the examples that are definitely spam: every pair of similar deceptive reviews is scored
+		and written to the edge list. The same can be applied to the negative ones as well or to the whole data.
+	'''
+	deceptive = positive_df[positive_df['target'] == -1]
+	pairs = write_edge_list(SIMILAR_REVIEWS, untruthful.similar_pairs(deceptive['review'].tolist(), deceptive.index.tolist()))
+	print "%d similar pairs of %d deceptive reviews written to %s" % (pairs, len(deceptive), SIMILAR_REVIEWS)
+	'''
+		A random test case
+	'''	
+	review1 = "I love this product"
+	review2 = "I like this product"
+	print untruthful.score(review1,review2)
+	print word_similarity_stats()
 
 
-'''
-	Implementation of Perl's Autovivification feature.
-	Possible data structure for R in P_semantic.
-'''
+	target = []
+	for i in negative_df.index:
+		if ((negative_df['labeled_class'][i] == 'negative') & (negative_df['actual_class'][i] == 't')):
+			target.append(1)
+		elif ((negative_df['labeled_class'][i] == 'negative') & (negative_df['actual_class'][i] == 'd')):
+			target.append(-1)
+		else:
+			print "Error"
+	negative_df['target'] = target
 
-class AutoVivification(dict):
-	def __getitem__(self, item):
-		try:
-			return dict.__getitem__(self, item)
-		except KeyError:
-			value = self[item] = type(self)()
-			return value
+	data = positive_df.merge(negative_df,how='outer')
+	data = data[['review','target']]